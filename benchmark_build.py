@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+网站构建基准测试
+
+生成 100 / 1k / 10k 页的合成词汇表（链接密度、带说明的图片和代码块与真实词条相近），
+用 WebsiteGenerator 构建并记录各阶段耗时、吞吐量、峰值内存和内存分配热点，
+结果保存为 JSON，便于在不同提交之间比较:
+
+    python benchmark_build.py -o before.json
+    （修改代码后）
+    python benchmark_build.py -o after.json --compare before.json
+
+每个页面都包含完整的导航，输出大小随页数平方增长（10k 页时约数 GB，写在临时目录中，结束后删除）；
+只想快速比较时可以用 --sizes 100,1000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+SECTIONS = ["device-hardware", "device-software", "host-software", "perf"]
+
+# 各阶段按构建流程排列，与 generate_website 中 _timed 的阶段名一致
+STAGES = ["read", "markdown_setup", "markdown_convert", "postprocess", "nav", "template", "write", "search_index", "links"]
+
+_WORDS = ("线程束 调度器 寄存器 共享内存 全局内存 带宽 延迟 吞吐量 内核 线程块 流式多处理器 "
+          "占用率 指令 流水线 缓存 张量核心 the warp scheduler issues one instruction per cycle "
+          "memory bandwidth latency hiding arithmetic intensity").split()
+
+_CODE_SAMPLES = [
+    ("cpp", "__global__ void saxpy(int n, float a, float *x, float *y) {\n"
+            "    int i = blockIdx.x * blockDim.x + threadIdx.x;\n"
+            "    if (i < n) y[i] = a * x[i] + y[i];\n}"),
+    ("", "最大线程束/SM：64\n最大块/SM：32\n寄存器：65536\n共享内存：228 KB"),
+    ("python", "import torch\nx = torch.randn(4096, 4096, device='cuda')\ny = x @ x"),
+    ("", "$ nvidia-smi --query-gpu=name,memory.used --format=csv"),
+]
+
+
+def _page_paths(pages: int) -> List[str]:
+    """合成页面的路径（不含扩展名），包括首页和各分区的索引页"""
+    paths = ["readme"] + SECTIONS
+    for index in range(max(0, pages - len(paths))):
+        paths.append(f"{SECTIONS[index % len(SECTIONS)]}/term-{index:05d}")
+    return paths[:pages]
+
+
+def _paragraph(rng: random.Random, paths: List[str], words: int, link_every: int) -> str:
+    parts = []
+    for i in range(words):
+        word = rng.choice(_WORDS)
+        if i % link_every == link_every - 1:
+            parts.append(f"[{word}](/gpu-glossary/{rng.choice(paths)})")
+        else:
+            parts.append(word)
+    return " ".join(parts) + "。"
+
+
+def _synthetic_page(rng: random.Random, path: str, paths: List[str]) -> str:
+    """生成一个页面：front matter、若干段落（约每 12 个词一个链接）、列表、图片说明和代码块"""
+    title = f"什么是{path.rsplit('/', 1)[-1]}？"
+    lines = ["---", f"title: {title}", f"nav_title: {path.rsplit('/', 1)[-1]}"]
+    if path == "readme":
+        lines.append("nav_order: 0")
+    lines.extend(["---", ""])
+    lines.append(_paragraph(rng, paths, rng.randint(40, 90), 12))
+    lines.append("")
+    if rng.random() < 0.4:
+        lines.append(f"![](https://example.com/images/{rng.randrange(10 ** 6)}.png)")
+        lines.append("")
+        lines.append("> " + _paragraph(rng, paths, rng.randint(15, 30), 10))
+        lines.append("")
+    for _ in range(rng.randint(1, 4)):
+        if rng.random() < 0.3:
+            lines.append(f"## {rng.choice(_WORDS)}")
+            lines.append("")
+        lines.append(_paragraph(rng, paths, rng.randint(30, 120), 12))
+        lines.append("")
+    if rng.random() < 0.5:
+        for _ in range(rng.randint(2, 5)):
+            lines.append("- **" + rng.choice(_WORDS) + "**：" + _paragraph(rng, paths, rng.randint(8, 20), 8))
+        lines.append("")
+    if rng.random() < 0.5:
+        language, code = rng.choice(_CODE_SAMPLES)
+        lines.extend([f"```{language}", code, "```", ""])
+    return "\n".join(lines)
+
+
+def generate_glossary(root: Path, pages: int, seed: int = 0):
+    """在 root 下写出合成词汇表（导航由各页面的 front matter 生成）"""
+    rng = random.Random(seed)
+    paths = _page_paths(pages)
+    for path in paths:
+        md_file = root / f"{path}.md"
+        md_file.parent.mkdir(parents=True, exist_ok=True)
+        md_file.write_text(_synthetic_page(rng, path, paths), encoding='utf-8')
+
+
+def _peak_rss_mb() -> float:
+    """当前进程和已结束子进程的峰值 RSS（ru_maxrss 在 Linux 上以 KB 为单位，macOS 上以字节为单位）"""
+    divisor = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak / divisor, 1)
+
+
+def run_case(pages: int, jobs: int, trace: bool, seed: int = 0, streaming: bool = False) -> Dict:
+    """
+    构建一个规模的合成词汇表并返回测量结果
+
+    在独立进程中调用，峰值 RSS 不受其他规模的影响
+    """
+    from generate_website import WebsiteGenerator
+
+    with tempfile.TemporaryDirectory(prefix="glossary-bench-") as tmp:
+        input_dir = Path(tmp) / "src"
+        output_dir = Path(tmp) / "site"
+        generate_glossary(input_dir, pages, seed)
+        source_bytes = sum(path.stat().st_size for path in input_dir.rglob("*.md"))
+
+        if trace:
+            tracemalloc.start(1)
+            before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            # 生成器在初始化时读取各页面的 front matter 生成导航，计入构建时间
+            generator = WebsiteGenerator(input_dir, output_dir, "/")
+            errors = generator.generate_all(jobs=jobs, streaming=streaming)
+        elapsed = time.perf_counter() - start
+
+        hotspots = []
+        traced_peak = None
+        if trace:
+            # 与构建前的快照比较，只列出构建过程中新分配且仍被持有的内存
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+                      tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+            after = tracemalloc.take_snapshot().filter_traces(ignore)
+            traced_peak = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            tracemalloc.stop()
+            for stat in after.compare_to(before.filter_traces(ignore), "lineno")[:10]:
+                frame = stat.traceback[0]
+                hotspots.append({
+                    "location": f"{frame.filename}:{frame.lineno}",
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                })
+
+        output_bytes = sum(path.stat().st_size for path in output_dir.rglob("*.html"))
+
+    stages = {stage: round(generator.timings.get(stage, 0.0), 4) for stage in STAGES}
+    stages["other"] = round(max(0.0, elapsed - sum(generator.timings.values())) if jobs == 1 else 0.0, 4)
+    return {
+        "pages": pages,
+        "jobs": jobs,
+        "streaming": streaming,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1),
+        "source_mb": round(source_bytes / 2 ** 20, 2),
+        "output_mb": round(output_bytes / 2 ** 20, 2),
+        "errors": len(errors),
+        "stages": stages,
+        "peak_rss_mb": _peak_rss_mb(),
+        "tracemalloc_peak_mb": traced_peak,
+        "hotspots": hotspots,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(Path(__file__).parent),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_case(case: Dict):
+    mode = "，streaming" if case.get("streaming") else ""
+    print(f"\n{case['pages']} 页（jobs={case['jobs']}{mode}）: {case['seconds']:.2f} 秒，"
+          f"{case['pages_per_sec']:.0f} 页/秒，峰值 RSS {case['peak_rss_mb']} MB，"
+          f"输出 {case['output_mb']} MB")
+    total = sum(case["stages"].values()) or 1.0
+    for stage, seconds in sorted(case["stages"].items(), key=lambda kv: -kv[1]):
+        if seconds:
+            print(f"  {stage:<16} {seconds:8.3f}s  {seconds / total * 100:5.1f}%")
+    if case["hotspots"]:
+        print(f"  tracemalloc 峰值 {case['tracemalloc_peak_mb']} MB，构建期间新增且仍被持有的内存最多的位置:")
+        for spot in case["hotspots"]:
+            print(f"    {spot['size_kb']:10.1f} KB  {spot['count']:7d} 个  {spot['location']}")
+
+
+def _print_comparison(baseline: Dict, cases: List[Dict]):
+    """按 (页数, jobs) 与基线结果对比"""
+    old_cases = {(case["pages"], case["jobs"]): case for case in baseline.get("cases", [])}
+    print(f"\n与基线 {baseline.get('commit') or '?'} 对比:")
+    for case in cases:
+        old = old_cases.get((case["pages"], case["jobs"]))
+        if old is None:
+            continue
+        speedup = old["seconds"] / case["seconds"] if case["seconds"] else 0.0
+        print(f"  {case['pages']:>6} 页: {old['seconds']:.2f}s → {case['seconds']:.2f}s（{speedup:.2f}x），"
+              f"峰值 RSS {old['peak_rss_mb']} → {case['peak_rss_mb']} MB")
+        for stage, seconds in case["stages"].items():
+            before = old["stages"].get(stage, 0.0)
+            if before or seconds:
+                print(f"      {stage:<16} {before:8.3f}s → {seconds:8.3f}s")
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description="网站构建基准测试（合成词汇表）")
+    parser.add_argument("--sizes", default="100,1000,10000", help="页数，逗号分隔（默认 100,1000,10000）")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="构建的并行进程数（默认 1）")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="记录内存分配热点（明显变慢；jobs > 1 时只统计主进程）")
+    parser.add_argument("--streaming", action="store_true", help="使用低内存的 streaming 构建模式")
+    parser.add_argument("--seed", type=int, default=0, help="合成内容的随机种子")
+    parser.add_argument("-o", "--output", type=Path, help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", type=Path, help="与之前保存的 JSON 结果对比")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": [],
+    }
+    # 每个规模在新进程（spawn）中运行，峰值 RSS 和已加载的模块互不影响
+    context = multiprocessing.get_context("spawn")
+    for pages in (int(size) for size in args.sizes.split(",")):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            case = executor.submit(run_case, pages, args.jobs, args.tracemalloc, args.seed,
+                                   args.streaming).result()
+        results["cases"].append(case)
+        _print_case(case)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            _print_comparison(json.load(f), results["cases"])
+
+
+if __name__ == "__main__":
+    main()
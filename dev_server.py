@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+本地预览服务器：用 http.server 提供生成的网站目录
+
+加上 --watch 时监视 translated/ 中的 Markdown 文件，变化后只重新生成受影响的页面，
+并通过 SSE（/__livereload）通知打开的浏览器刷新
+"""
+
+import argparse
+import functools
+import os
+import threading
+import time
+import traceback
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+LIVERELOAD_PATH = "/__livereload"
+
+# 注入到开发服务器返回的 HTML 中（不会写入生成的文件）
+LIVERELOAD_SCRIPT = f"""<script>
+(function () {{
+    var source = new EventSource('{LIVERELOAD_PATH}');
+    source.addEventListener('reload', function () {{ location.reload(); }});
+}})();
+</script>
+"""
+
+# SSE 连接的心跳间隔（秒），防止代理或浏览器认为连接已断开
+KEEPALIVE_INTERVAL = 15
+
+
+class LiveReloadHub:
+    """记录重新生成的次数，SSE 连接等待次数变化后通知浏览器刷新"""
+
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        """等待版本号超过 version 或超时，返回当前版本号"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+
+class SourceWatcher(threading.Thread):
+    """
+    轮询监视目录中的 Markdown 文件
+
+    每 interval 秒比较一次 (mtime, 大小)；检测到变化后等到 debounce 秒内没有新的变化，
+    再把这段时间内变化和删除的文件一次性交给回调（编辑器保存时常常连续写多次）
+    """
+
+    def __init__(self, directory: Path, callback: Callable[[List[Path], List[Path]], None],
+                 interval: float = 0.1, debounce: float = 0.05):
+        super().__init__(daemon=True)
+        self.directory = directory
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        self.stopped = threading.Event()
+
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.directory.rglob("*.md"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def run(self):
+        previous = self._snapshot()
+        changed: set = set()
+        removed: set = set()
+        last_change = 0.0
+
+        while not self.stopped.wait(self.interval if not changed and not removed else self.debounce):
+            current = self._snapshot()
+            for path, signature in current.items():
+                if previous.get(path) != signature:
+                    changed.add(path)
+                    removed.discard(path)
+                    last_change = time.monotonic()
+            for path in previous.keys() - current.keys():
+                removed.add(path)
+                changed.discard(path)
+                last_change = time.monotonic()
+            previous = current
+
+            if (changed or removed) and time.monotonic() - last_change >= self.debounce:
+                try:
+                    self.callback(sorted(changed), sorted(removed))
+                except Exception:
+                    traceback.print_exc()
+                changed, removed = set(), set()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """只输出出错的请求"""
+
+    def log_message(self, format, *args):
+        if len(args) >= 2 and str(args[1]).startswith(('4', '5')):
+            super().log_message(format, *args)
+
+
+class LiveReloadHandler(QuietHandler):
+    """在 HTML 中注入刷新脚本，并提供 SSE 通知"""
+
+    hub: LiveReloadHub = None
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == LIVERELOAD_PATH:
+            self._stream_events()
+            return
+        file_path = Path(self.translate_path(path))
+        if file_path.is_dir():
+            file_path = file_path / "index.html"
+        if file_path.suffix == ".html" and file_path.is_file():
+            self._send_html(file_path)
+            return
+        super().do_GET()
+
+    def _send_html(self, file_path: Path):
+        html = file_path.read_text(encoding='utf-8')
+        index = html.rfind("</body>")
+        html = html[:index] + LIVERELOAD_SCRIPT + html[index:] if index >= 0 else html + LIVERELOAD_SCRIPT
+        data = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.hub.version
+        try:
+            while True:
+                current = self.hub.wait(version, KEEPALIVE_INTERVAL)
+                if current > version:
+                    version = current
+                    self.wfile.write(f"event: reload\ndata: {version}\n\n".encode('utf-8'))
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def serve(directory: Path, host: str = "127.0.0.1", port: int = 8000,
+          hub: Optional[LiveReloadHub] = None):
+    """提供 directory 目录，直到按 Ctrl+C；提供 hub 时启用自动刷新"""
+    if hub is None:
+        handler = functools.partial(QuietHandler, directory=str(directory))
+    else:
+        handler_class = type("Handler", (LiveReloadHandler,), {"hub": hub})
+        handler = functools.partial(handler_class, directory=str(directory))
+    with ThreadingHTTPServer((host, port), handler) as httpd:
+        httpd.daemon_threads = True
+        print(f"提供 {directory}，访问 http://{host}:{httpd.server_address[1]}/ （Ctrl+C 退出）")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n已停止")
+
+
+def make_rebuilder(generator, hub: LiveReloadHub) -> Callable[[List[Path], List[Path]], None]:
+    """
+    返回文件变化时的回调：重新生成变化的页面和"被引用"列表因此变化的页面，
+    删除已删除源文件的页面，然后通知浏览器。
+    front matter 的变化影响导航时，所有页面都需要重新生成
+    """
+
+    def rebuild(changed: List[Path], removed: List[Path]):
+        start = time.perf_counter()
+        nav = generator._build_nav_structure()
+        if nav != generator.nav_structure:
+            generator.nav_structure = nav
+            generator._nav_cache = None
+            print("导航已变化，重新生成全部页面")
+            generator.generate_all(incremental=True, jobs=os.cpu_count() or 1)
+            hub.notify()
+            print(f"↻ 全部页面（{(time.perf_counter() - start) * 1000:.0f} ms）")
+            return
+
+        affected = set()
+        for md_file in removed:
+            page = md_file.relative_to(generator.input_dir).with_suffix('')
+            affected |= generator.link_graph.remove_page(page.as_posix())
+            html_file = generator.output_dir / page.with_suffix('.html')
+            if html_file.exists():
+                html_file.unlink()
+        for md_file in changed:
+            affected |= generator.update_page_links(md_file)
+        generator.report_broken_links(md_file.relative_to(generator.input_dir).with_suffix('').as_posix()
+                                      for md_file in changed)
+
+        pages = set(changed) | {generator.input_dir / f"{page}.md" for page in affected}
+        for md_file in sorted(pages):
+            if not md_file.exists():
+                continue
+            rel_path = md_file.relative_to(generator.input_dir)
+            try:
+                generator.generate_page(md_file, generator.output_dir / rel_path.with_suffix('.html'),
+                                        verbose=False)
+            except Exception:
+                print(f"✗ 失败: {rel_path}")
+                traceback.print_exc()
+        # 页面写完就通知浏览器刷新，搜索索引随后更新（只重新索引变化的页面）
+        hub.notify()
+        generator.write_search_index(changed, removed)
+        names = ', '.join(str(path.relative_to(generator.input_dir)) for path in changed + removed)
+        print(f"↻ {names}（{(time.perf_counter() - start) * 1000:.0f} ms）")
+
+    return rebuild
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="本地预览生成的网站")
+    parser.add_argument("directory", type=Path, nargs="?", default=script_dir / "website",
+                        help="网站目录（默认 website/）")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    parser.add_argument("-p", "--port", type=int, default=8000, help="端口（默认 8000）")
+    parser.add_argument("--watch", action="store_true",
+                        help="监视 Markdown 源文件，变化后重新生成对应页面并自动刷新浏览器")
+    parser.add_argument("--input", type=Path, default=script_dir / "translated",
+                        help="--watch 监视的 Markdown 目录（默认 translated/）")
+    parser.add_argument("--base-path", default="",
+                        help="--watch 构建时使用的 base path（默认为空，适合本地预览）")
+    args = parser.parse_args(argv)
+
+    if not args.watch:
+        if not args.directory.exists():
+            print(f"错误: 目录不存在: {args.directory}")
+            print("请先运行 generate_website.py 生成网站（本地预览请加 --base-path ''），或使用 --watch")
+            return
+        serve(args.directory, args.host, args.port)
+        return
+
+    if not args.input.exists():
+        print(f"错误: 目录不存在: {args.input}")
+        return
+
+    from generate_website import WebsiteGenerator, get_markdown_converter
+    generator = WebsiteGenerator(args.input, args.directory, args.base_path)
+    # 启动时做一次增量构建，之后只重新生成变化的页面
+    generator.generate_all(incremental=True, jobs=os.cpu_count() or 1)
+    # 页面由进程池生成时，当前进程还没有加载 markdown 扩展和 Pygments 词法分析器
+    # （没有语言标记的代码块会触发 guess_lexer 导入全部词法分析器），提前加载，第一次保存时不必等待
+    get_markdown_converter().reset().convert("```\nwarmup\n```\n")
+
+    hub = LiveReloadHub()
+    watcher = SourceWatcher(args.input, make_rebuilder(generator, hub))
+    watcher.start()
+    print(f"\n监视 {args.input} 中的变化")
+    try:
+        serve(args.directory, args.host, args.port, hub)
+    finally:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,148 +4,379 @@ GPU Glossary 中文翻译工具
 从 GitHub 下载所有 markdown 文件并翻译成中文
 """
 
+import argparse
+import hashlib
+import json
 import os
+import queue
+import random
 import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 import requests
 from urllib.parse import urljoin
 
+from http_client import HttpClient
+from page_metadata import carry_nav_metadata, set_front_matter
+from terminology import TERM_MAPPING
+
+T = TypeVar("T")
+
 # GitHub 仓库配置
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com/modal-labs/gpu-glossary/main/gpu-glossary/"
 GITHUB_API_BASE = "https://api.github.com/repos/modal-labs/gpu-glossary/contents/gpu-glossary"
+GITHUB_TREE_URL = "https://api.github.com/repos/modal-labs/gpu-glossary/git/trees/main?recursive=1"
 
 # 输出目录
 OUTPUT_DIR = Path(__file__).parent / "content"
 
+# 最近一次同步的报告（新增/变化/删除的文件列表）
+SYNC_REPORT_NAME = ".sync-report.json"
+
+# 流水线各阶段之间队列的容量：下载完成但尚未规范化、规范化完成但尚未保存的文件数上限
+PIPELINE_QUEUE_SIZE = 16
+
 
 class GitHubDownloader:
     """从 GitHub 下载文件"""
     
-    def __init__(self, base_url: str, api_url: str):
+    # 遇到限流或服务器错误时的最大重试次数
+    MAX_RETRIES = 5
+    # 单次退避的最长等待时间（秒）
+    MAX_BACKOFF = 120
+    
+    def __init__(self, base_url: str, api_url: str, tree_url: Optional[str] = GITHUB_TREE_URL,
+                 prefix: str = "gpu-glossary/", concurrency: int = 8,
+                 http_client: Optional[HttpClient] = None):
+        """
+        Args:
+            base_url: 原始文件下载地址前缀
+            api_url: contents API 地址（tree_url 不可用时逐个目录列出文件）
+            tree_url: git trees API 地址，一次请求列出整个仓库的文件
+            prefix: 仓库中词汇表所在目录，下载后的路径会去掉该前缀
+            concurrency: 并发下载数，同时也是默认 HTTP 客户端的连接池大小
+            http_client: 共享的 HTTP 客户端，默认新建一个
+        """
         self.base_url = base_url
         self.api_url = api_url
-        self.session = requests.Session()
+        self.tree_url = tree_url
+        self.prefix = prefix
+        self.concurrency = max(1, concurrency)
+        
+        token = os.getenv("GITHUB_TOKEN")
+        self.http = http_client or HttpClient(
+            pool_size=self.concurrency, timeout=(10, 30),
+            headers={"Authorization": f"Bearer {token}"} if token else None,
+        )
+        
+        # 所有线程共享的限流状态：在该时间点之前不再发出请求
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+    
+    def _wait_for_rate_limit(self):
+        """如果之前的响应表明额度已用完，等待到额度恢复"""
+        with self._lock:
+            delay = self._paused_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _pause(self, seconds: float):
+        """让所有线程暂停发出请求"""
+        seconds = min(max(seconds, 0.0), self.MAX_BACKOFF)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+    
+    def _retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """
+        根据响应判断是否需要重试，返回等待秒数；不需要重试时返回 None
+        
+        优先使用 Retry-After，其次是 X-RateLimit-Reset，最后是指数退避
+        """
+        status = response.status_code
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        rate_limited = status == 429 or (status == 403 and remaining == "0")
+        if not rate_limited and status < 500:
+            return None
+        
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        reset = response.headers.get("X-RateLimit-Reset")
+        if rate_limited and reset and reset.isdigit():
+            return float(reset) - time.time() + 1
+        return min(2 ** attempt + random.random(), self.MAX_BACKOFF)
+    
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """带限流退避和重试的 GET 请求"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._wait_for_rate_limit()
+            response = self.http.get(url, **kwargs)
+            
+            # 额度即将用完时，主动暂停到重置时间，避免触发 403
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            reset = response.headers.get("X-RateLimit-Reset")
+            if remaining == "0" and reset and reset.isdigit():
+                self._pause(float(reset) - time.time() + 1)
+            
+            delay = self._retry_delay(response, attempt)
+            if delay is None or attempt == self.MAX_RETRIES:
+                break
+            print(f"请求受限 ({response.status_code})，{delay:.1f} 秒后重试: {url}")
+            self._pause(delay)
+        
+        response.raise_for_status()
+        return response
     
     def get_directory_contents(self, path: str = "") -> List[Dict]:
         """获取目录内容"""
         url = f"{self.api_url}/{path}" if path else self.api_url
-        response = self.session.get(url)
-        response.raise_for_status()
-        return response.json()
+        return self._get(url).json()
     
     def download_file(self, file_path: str) -> str:
         """下载单个文件"""
         url = urljoin(self.base_url, file_path)
-        response = self.session.get(url)
-        response.raise_for_status()
+        response = self._get(url)
+        response.encoding = 'utf-8'
         return response.text
     
-    def download_all_markdown_files(self, base_path: str = "") -> Dict[str, str]:
-        """递归下载所有 markdown 文件"""
-        files = {}
+    def download_file_if_changed(self, file_path: str, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        条件下载单个文件
+        
+        Returns:
+            (文件内容，未变化（304）时为 None；新的 ETag)
+        """
+        url = urljoin(self.base_url, file_path)
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self._get(url, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        response.encoding = 'utf-8'
+        return response.text, response.headers.get("ETag")
+    
+    def _list_via_contents(self, base_path: str = "") -> Dict[str, str]:
+        """逐个目录调用 contents API 列出 markdown 文件（tree API 不可用时的后备方案）"""
+        blobs = {}
+        for item in self.get_directory_contents(base_path):
+            rel = item['path'].replace(self.prefix, '', 1)
+            if item['type'] == 'file' and item['name'].endswith('.md'):
+                blobs[rel] = item.get('sha', '')
+            elif item['type'] == 'dir':
+                print(f"进入目录: {rel}")
+                blobs.update(self._list_via_contents(rel))
+        return blobs
+    
+    def list_markdown_blobs(self, cache: Optional["DownloadCache"] = None) -> Dict[str, str]:
+        """
+        列出所有 markdown 文件及其 blob SHA {相对 prefix 的路径: sha}
+        
+        提供 cache 时对 tree API 发送条件请求，仓库没有变化时直接使用缓存中上次列出的完整列表
+        （而不是已下载成功的文件），上次下载失败的文件仍会被重新下载
+        """
+        if self.tree_url:
+            headers = {}
+            if cache is not None and cache.tree_etag and cache.tree:
+                headers["If-None-Match"] = cache.tree_etag
+            response = self._get(self.tree_url, headers=headers)
+            if response.status_code == 304:
+                return dict(cache.tree)
+            tree = response.json()
+            if not tree.get('truncated'):
+                blobs = {
+                    item['path'][len(self.prefix):]: item.get('sha', '')
+                    for item in sorted(tree.get('tree', []), key=lambda item: item['path'])
+                    if item['type'] == 'blob'
+                    and item['path'].startswith(self.prefix)
+                    and item['path'].endswith('.md')
+                }
+                if cache is not None:
+                    cache.tree_etag = response.headers.get("ETag")
+                    cache.tree = dict(blobs)
+                return blobs
+            print("tree API 结果被截断，改为逐个目录列出文件")
+        return dict(sorted(self._list_via_contents().items()))
+    
+    def list_markdown_files(self) -> List[str]:
+        """列出所有 markdown 文件（相对 prefix 的路径）"""
+        return list(self.list_markdown_blobs())
+    
+    def _stream(self, fetch: Callable[[str], T], paths: Iterable[str],
+                queue_size: int = PIPELINE_QUEUE_SIZE) -> Iterator[Tuple[str, Optional[T], Optional[Exception]]]:
+        """
+        用 concurrency 个线程并发执行 fetch(path)，按完成顺序产出 (路径, 结果, 异常)
+        
+        结果经过容量为 queue_size 的队列交给调用方：调用方处理不过来时下载线程阻塞，
+        内存中已下载但尚未处理的文件最多为 queue_size + concurrency 个
+        """
+        paths = list(paths)
+        results: "queue.Queue[Tuple[str, Optional[T], Optional[Exception]]]" = queue.Queue(maxsize=queue_size)
+        pending = iter(paths)
+        pending_lock = threading.Lock()
+        stopped = threading.Event()
+        
+        def worker():
+            while not stopped.is_set():
+                with pending_lock:
+                    path = next(pending, None)
+                if path is None:
+                    return
+                try:
+                    item = (path, fetch(path), None)
+                except Exception as e:
+                    item = (path, None, e)
+                while not stopped.is_set():
+                    try:
+                        results.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for _ in range(min(self.concurrency, len(paths))):
+                executor.submit(worker)
+            try:
+                for _ in paths:
+                    yield results.get()
+            finally:
+                # 调用方提前结束（例如出错）时让下载线程尽快退出
+                stopped.set()
+    
+    def sync(self, output_dir: Path, cache: "DownloadCache",
+             report: Dict[str, List[str]]) -> Iterator[Tuple[str, str]]:
+        """
+        与上游同步：只下载 blob SHA 与本地文件不同的文件，按下载完成的顺序逐个产出 (路径, 内容)
+        
+        Args:
+            output_dir: 本地镜像目录（content/）
+            cache: 下载缓存，记录每个文件的 blob SHA 和 ETag
+            report: 同步报告 {'new'/'changed'/'deleted'/'unchanged': [路径, ...]}，遍历结束后填写完整
+        """
+        for key in ('new', 'changed', 'deleted', 'unchanged'):
+            report.setdefault(key, [])
+        blobs = self.list_markdown_blobs(cache)
+        
+        to_fetch: Dict[str, Optional[str]] = {}
+        for path, sha in blobs.items():
+            local_file = output_dir / path
+            local_sha = git_blob_sha(local_file.read_bytes()) if local_file.exists() else None
+            if sha and local_sha == sha:
+                report['unchanged'].append(path)
+                cache.update(path, sha)
+                continue
+            # 本地文件就是上次下载的版本时才发送 ETag，304 表示本地内容仍然是最新的
+            entry = cache.get(path)
+            etag = entry.get('etag') if local_sha and entry.get('sha') == local_sha else None
+            to_fetch[path] = etag
+        
+        print(f"共 {len(blobs)} 个文件，{len(report['unchanged'])} 个未变化，需要检查 {len(to_fetch)} 个")
         
+        fetch = lambda path: self.download_file_if_changed(path, to_fetch[path])
+        for path, result, error in self._stream(fetch, to_fetch):
+            if error is not None:
+                print(f"错误: {path}: {error}")
+                continue
+            content, etag = result
+            if content is None:
+                report['unchanged'].append(path)
+                cache.update(path, cache.get(path).get('sha'), etag)
+                continue
+            print(f"下载: {path}")
+            report['changed' if (output_dir / path).exists() else 'new'].append(path)
+            cache.update(path, blobs[path] or git_blob_sha(content.encode('utf-8')), etag)
+            yield path, content
+        
+        # 上游已删除的文件（只处理之前由本工具下载过的文件）
+        for path in sorted(set(cache.blob_shas()) - set(blobs)):
+            report['deleted'].append(path)
+            cache.remove(path)
+        
+        for key in report:
+            report[key].sort()
+    
+    def download_all_markdown_files(self, base_path: str = "") -> Iterator[Tuple[str, str]]:
+        """并发下载所有 markdown 文件，按下载完成的顺序逐个产出 (路径, 内容)"""
         try:
-            contents = self.get_directory_contents(base_path)
-            
-            for item in contents:
-                if item['type'] == 'file' and item['name'].endswith('.md'):
-                    file_path = item['path'].replace('gpu-glossary/', '', 1)
-                    print(f"下载: {file_path}")
-                    content = self.download_file(file_path)
-                    files[file_path] = content
-                    time.sleep(0.5)  # 避免请求过快
-                    
-                elif item['type'] == 'dir':
-                    subdir_path = item['path'].replace('gpu-glossary/', '', 1)
-                    print(f"进入目录: {subdir_path}")
-                    sub_files = self.download_all_markdown_files(item['path'].replace('gpu-glossary/', '', 1))
-                    files.update(sub_files)
-                    
+            paths = self.list_markdown_files()
         except Exception as e:
             print(f"错误: {e}")
+            return
+        
+        if base_path:
+            paths = [p for p in paths if p.startswith(base_path.rstrip('/') + '/')]
+        
+        print(f"共 {len(paths)} 个文件，并发数 {self.concurrency}")
         
-        return files
+        for path, content, error in self._stream(self.download_file, paths):
+            if error is not None:
+                print(f"错误: {path}: {error}")
+                continue
+            print(f"下载: {path}")
+            yield path, content
+
+
+def git_blob_sha(data: bytes) -> str:
+    """计算与 git 相同的 blob SHA，用于和 tree API 返回的 sha 比较"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class DownloadCache:
+    """
+    下载缓存：记录每个文件的 blob SHA 和 ETag，以及 tree API 的 ETag 和它对应的完整文件列表
+    
+    保存在本地镜像目录中（content/.download-cache.json）
+    """
+    
+    FILE_NAME = ".download-cache.json"
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.tree_etag: Optional[str] = None
+        self.tree: Dict[str, str] = {}  # tree_etag 对应的文件列表 {路径: blob SHA}
+        self.files: Dict[str, Dict[str, Optional[str]]] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.tree_etag = data.get("tree_etag")
+                self.tree = data.get("tree", {})
+                self.files = data.get("files", {})
+            except (OSError, ValueError) as e:
+                print(f"忽略损坏的下载缓存 {path}: {e}")
+    
+    def get(self, path: str) -> Dict[str, Optional[str]]:
+        return self.files.get(path, {})
+    
+    def update(self, path: str, sha: Optional[str], etag: Optional[str] = None):
+        entry = self.files.setdefault(path, {})
+        entry['sha'] = sha
+        if etag:
+            entry['etag'] = etag
+    
+    def remove(self, path: str):
+        self.files.pop(path, None)
+    
+    def blob_shas(self) -> Dict[str, str]:
+        return {path: entry.get('sha') or '' for path, entry in sorted(self.files.items())}
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({"tree_etag": self.tree_etag, "tree": self.tree, "files": self.files}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
 
 
 class MarkdownTranslator:
     """翻译 Markdown 内容"""
     
-    # 术语翻译映射表
-    TERM_MAPPING = {
-        # 硬件相关
-        "Streaming Multiprocessor": "流式多处理器",
-        "SM": "流式多处理器",
-        "Core": "核心",
-        "CUDA Core": "CUDA核心",
-        "Tensor Core": "Tensor核心",
-        "Special Function Unit": "特殊函数单元",
-        "SFU": "特殊函数单元",
-        "Load/Store Unit": "加载/存储单元",
-        "LSU": "加载/存储单元",
-        "Warp Scheduler": "Warp调度器",
-        "Tensor Memory Accelerator": "Tensor内存加速器",
-        "TMA": "Tensor内存加速器",
-        "Texture Processing Cluster": "纹理处理簇",
-        "TPC": "纹理处理簇",
-        "Graphics Processing Cluster": "图形处理簇",
-        "GPU Processing Cluster": "GPU处理簇",
-        "GPC": "图形/GPU处理簇",
-        "Register File": "寄存器文件",
-        "L1 Data Cache": "L1数据缓存",
-        "Tensor Memory": "Tensor内存",
-        "GPU RAM": "GPU内存",
-        
-        # 软件相关
-        "Thread": "线程",
-        "Warp": "线程束",
-        "Cooperative Thread Array": "协作线程数组",
-        "CTA": "协作线程数组",
-        "Kernel": "内核",
-        "Thread Block": "线程块",
-        "Thread Block Grid": "线程块网格",
-        "Thread Hierarchy": "线程层次结构",
-        "Memory Hierarchy": "内存层次结构",
-        "Registers": "寄存器",
-        "Shared Memory": "共享内存",
-        "Global Memory": "全局内存",
-        
-        # CUDA工具
-        "CUDA Driver API": "CUDA驱动API",
-        "CUDA Runtime API": "CUDA运行时API",
-        "NVIDIA Management Library": "NVIDIA管理库",
-        "NVML": "NVIDIA管理库",
-        "Streaming ASSembler": "流式汇编器",
-        "SASS": "流式汇编器",
-        "Parallel Thread eXecution": "并行线程执行",
-        "PTX": "并行线程执行",
-        "Compute Capability": "计算能力",
-        
-        # 性能相关
-        "Performance Bottleneck": "性能瓶颈",
-        "Roofline Model": "屋顶线模型",
-        "Compute-bound": "计算受限",
-        "Memory-bound": "内存受限",
-        "Arithmetic Intensity": "算术强度",
-        "Overhead": "开销",
-        "Little's Law": "利特尔定律",
-        "Memory Bandwidth": "内存带宽",
-        "Arithmetic Bandwidth": "算术带宽",
-        "Latency Hiding": "延迟隐藏",
-        "Warp Execution State": "Warp执行状态",
-        "Active Cycle": "活跃周期",
-        "Occupancy": "占用率",
-        "Pipe Utilization": "流水线利用率",
-        "Peak Rate": "峰值速率",
-        "Issue Efficiency": "发射效率",
-        "Streaming Multiprocessor Utilization": "流式多处理器利用率",
-        "Warp Divergence": "Warp分歧",
-        "Branch Efficiency": "分支效率",
-        "Memory Coalescing": "内存合并",
-        "Bank Conflict": "Bank冲突",
-        "Register Pressure": "寄存器压力",
-    }
+    # 术语翻译映射表（检查和提示词注入见 terminology.py）
+    TERM_MAPPING = TERM_MAPPING
+    
+    # Modal 网站上的词条链接（到空白或右括号为止，不跨行）
+    MODAL_LINK_RE = re.compile(r'https://modal\.com/gpu-glossary/([^\)]+)')
     
     def __init__(self):
         """初始化翻译器"""
@@ -162,32 +393,89 @@ class MarkdownTranslator:
         # 可以集成 OpenAI API, Google Translate API 等
         # 为了示例，这里返回带有翻译标记的内容
         
-        translated = content
-        
-        # 添加翻译说明
-        header = f"""---
-原文链接: https://modal.com/gpu-glossary/{file_path.replace('.md', '').replace('readme', '')}
-翻译状态: 待翻译
----
-
-"""
-        translated = header + translated
-        
-        return translated
+        # 翻译说明合并到原文的 front matter 中（保持只有一个 front matter）
+        return set_front_matter(content, {
+            "原文链接": f"https://modal.com/gpu-glossary/{file_path.replace('.md', '').replace('readme', '')}",
+            "翻译状态": "待翻译",
+        })
     
     def update_links(self, content: str) -> str:
         """更新内部链接"""
         # 将 Modal 网站链接转换为本地链接
-        content = re.sub(
-            r'https://modal\.com/gpu-glossary/([^\)]+)',
-            r'../\1.html',
-            content
-        )
-        return content
+        return self.MODAL_LINK_RE.sub(r'../\1.html', content)
+    
+    def normalize(self, content: str, file_path: str, output_path: Path) -> str:
+        """
+        生成待翻译文件的内容：加上翻译说明，并保留已有译文 output_path 中的导航字段（nav_*）
+        """
+        return carry_nav_metadata(output_path, self.translate_content(content, file_path))
+
 
+def save_files(files: Iterable[Tuple[str, str]], translator: MarkdownTranslator,
+               output_dir: Path, translated_dir: Path, workers: int = 2,
+               queue_size: int = PIPELINE_QUEUE_SIZE) -> Tuple[List[str], Dict[str, str]]:
+    """
+    规范化并保存下载结果，每个文件到达后立即处理，不等待全部下载完成
+    
+    files 通常是下载器按完成顺序产出的迭代器。文件经过容量为 queue_size 的队列交给
+    workers 个线程：原文写入 output_dir，规范化后的待翻译文件写入 translated_dir。
+    队列满时不再从 files 取下一个文件，下载线程也随之阻塞，内存占用有上限
+    
+    Returns:
+        (已保存的文件, {文件: 错误信息})
+    """
+    pending: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=queue_size)
+    saved: List[str] = []
+    errors: Dict[str, str] = {}
+    lock = threading.Lock()
+    
+    def write(path: Path, text: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    
+    def worker():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            file_path, content = item
+            try:
+                output_path = output_dir / file_path
+                write(output_path, content)
+                print(f"保存: {output_path}")
+                translated_path = translated_dir / file_path
+                write(translated_path, translator.normalize(content, file_path, translated_path))
+                with lock:
+                    saved.append(file_path)
+            except Exception as e:
+                print(f"错误: 保存 {file_path} 失败: {e}")
+                with lock:
+                    errors[file_path] = str(e)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in range(workers):
+            executor.submit(worker)
+        try:
+            for item in files:
+                pending.put(item)
+        finally:
+            for _ in range(workers):
+                pending.put(None)
+    
+    return sorted(saved), errors
 
-def main():
+
+def main(argv: Optional[List[str]] = None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="从 GitHub 下载 GPU Glossary 原始 Markdown 文件")
+    parser.add_argument("-j", "--concurrency", type=int, default=8, help="并发下载数（默认 8）")
+    parser.add_argument("--full", action="store_true",
+                        help="忽略下载缓存，重新下载全部文件")
+    parser.add_argument("--save-workers", type=int, default=2,
+                        help="规范化并保存文件的线程数（默认 2）")
+    args = parser.parse_args(argv)
+    
     print("=" * 60)
     print("GPU Glossary 中文翻译工具")
     print("=" * 60)
@@ -195,38 +483,53 @@ def main():
     # 创建输出目录
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     
-    # 下载文件
-    print("\n步骤 1: 下载 markdown 文件...")
-    downloader = GitHubDownloader(GITHUB_RAW_BASE, GITHUB_API_BASE)
-    files = downloader.download_all_markdown_files()
-    
-    print(f"\n共下载 {len(files)} 个文件")
-    
-    # 保存原始文件
-    print("\n步骤 2: 保存文件...")
-    for file_path, content in files.items():
-        output_path = OUTPUT_DIR / file_path
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        print(f"保存: {output_path}")
+    translated_dir = OUTPUT_DIR.parent / "translated"
+    translated_dir.mkdir(parents=True, exist_ok=True)
     
-    # 翻译（当前仅添加翻译标记）
-    print("\n步骤 3: 准备翻译...")
+    # 下载、规范化和保存组成流水线：每个文件下载完成后立即规范化并写入磁盘
+    # （翻译当前仅添加翻译标记）
+    print("\n下载并保存 markdown 文件...")
+    downloader = GitHubDownloader(GITHUB_RAW_BASE, GITHUB_API_BASE, concurrency=args.concurrency)
     translator = MarkdownTranslator()
+    cache = None
+    report = None
+    if args.full:
+        files = downloader.download_all_markdown_files()
+    else:
+        cache = DownloadCache(OUTPUT_DIR / DownloadCache.FILE_NAME)
+        report = {}
+        files = downloader.sync(OUTPUT_DIR, cache, report)
     
-    translated_dir = OUTPUT_DIR.parent / "translated"
-    translated_dir.mkdir(parents=True, exist_ok=True)
+    # 获取文件列表失败等错误会中断同步；已保存的文件仍写入缓存和同步报告
+    failure = None
+    try:
+        saved, errors = save_files(files, translator, OUTPUT_DIR, translated_dir, workers=args.save_workers)
+    except Exception as e:
+        print(f"错误: 同步中断: {e}")
+        failure = e
+        saved = sorted(report['new'] + report['changed']) if report is not None else []
+        errors = {}
     
-    for file_path, content in files.items():
-        translated_content = translator.translate_content(content, file_path)
-        output_path = translated_dir / file_path
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    if report is not None:
+        for path in report['deleted']:
+            deleted_file = OUTPUT_DIR / path
+            if deleted_file.exists():
+                deleted_file.unlink()
+                print(f"删除: {deleted_file}")
+        cache.save()
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(translated_content)
+        # 同步报告，供增量翻译使用
+        with open(OUTPUT_DIR / SYNC_REPORT_NAME, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    print(f"\n共下载并保存 {len(saved)} 个文件，保存失败 {len(errors)} 个")
+    print(downloader.http.summary())
+    if report is not None:
+        print(f"新增 {len(report['new'])} 个，变化 {len(report['changed'])} 个，"
+              f"删除 {len(report['deleted'])} 个，未变化 {len(report['unchanged'])} 个")
+    if failure is not None:
+        print(f"\n同步未完成（{failure}），以上为部分结果")
+        sys.exit(1)
     
     print("\n" + "=" * 60)
     print("完成！")
@@ -236,7 +539,7 @@ def main():
     
     # 生成文件清单
     print("\n文件清单:")
-    for file_path in sorted(files.keys()):
+    for file_path in saved:
         print(f"  - {file_path}")
 
 
@@ -3,387 +3,155 @@
 生成 GPU Glossary 中文版静态网站
 """
 
+import argparse
+import hashlib
+import itertools
+import json
 import os
 import re
-import markdown
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from html import escape
 from pathlib import Path
-from typing import Dict, List, Tuple
+from string import Template
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from link_graph import LinkGraph, extract_links
+from page_metadata import PageMetadataIndex, iter_markdown_files, split_front_matter
+from search_index import SEARCH_JS, SearchIndexBuilder, SpillingSearchIndexBuilder, extract_text
 
-class WebsiteGenerator:
-    """静态网站生成器"""
+# markdown（以及 codehilite 用到的 Pygments）和进程池只在真正生成页面时才导入，
+# 列出过期页面等轻量命令不需要付出这部分启动开销
+if TYPE_CHECKING:
+    import markdown
+
+
+# 当前页面在导航中的高亮样式
+NAV_HIGHLIGHT_STYLE = b' style="color: #58a6ff; font-weight: bold;"'
+
+# 增量构建清单文件名（保存在输出目录中）
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 1
+
+# 页面元数据（front matter）缓存文件名（保存在输出目录中）
+METADATA_CACHE_NAME = ".page-metadata.json"
+
+
+def _sha256(data: bytes) -> str:
+    """计算内容哈希"""
+    return hashlib.sha256(data).hexdigest()
+
+
+# Markdown 扩展列表（所有页面共用同一套配置）
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'toc', 'tables', 'fenced_code']
+
+# 每个 worker（线程/进程）复用的 Markdown 转换器
+_converter_local = threading.local()
+
+# 当前进程累计的各阶段耗时（秒）
+_phase_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def _timed(phase: str):
+    """累计代码块耗时到 _phase_timings[phase]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase_timings[phase] = _phase_timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def take_phase_timings() -> Dict[str, float]:
+    """取出并清空当前进程累计的各阶段耗时"""
+    timings = dict(_phase_timings)
+    _phase_timings.clear()
+    return timings
+
+
+def get_markdown_converter() -> "markdown.Markdown":
+    """
+    获取当前 worker 的 Markdown 转换器
     
-    def __init__(self, input_dir: Path, output_dir: Path, base_path: str = "/gpu-glossary-zh/"):
-        self.input_dir = input_dir
-        self.output_dir = output_dir
-        self.base_path = base_path  # GitHub Pages 的基础路径
-        self.nav_structure = self._build_nav_structure()
+    扩展的导入和注册只在每个 worker 第一次调用时发生，之后复用同一个实例，
+    调用方在每篇文档转换前需要调用 reset()
+    """
+    md = getattr(_converter_local, 'md', None)
+    if md is None:
+        with _timed('markdown_setup'):
+            import markdown
+            md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _converter_local.md = md
+    return md
+
+
+def _print_phase_timings(timings: Dict[str, float]):
+    """打印各阶段耗时汇总"""
+    if not timings:
+        return
+    total = sum(timings.values())
+    print("\n各阶段耗时:")
+    for phase, seconds in sorted(timings.items(), key=lambda kv: -kv[1]):
+        share = seconds / total * 100 if total else 0.0
+        print(f"  {phase:<16} {seconds:8.3f}s  {share:5.1f}%")
+
+
+# 进程池中每个 worker 持有的生成器实例（由 _init_worker 设置）
+_worker_generator = None
+
+
+def _init_worker(generator: "WebsiteGenerator"):
+    """进程池初始化：每个 worker 只接收一次生成器实例"""
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _generate_page_in_worker(task: Tuple[Path, Path]) -> Tuple[Optional[str], Dict[str, float]]:
+    """
+    在 worker 中生成单个页面
     
-    def _build_nav_structure(self) -> List[Dict]:
-        """构建导航结构"""
-        return [
-            {
-                "title": "首页",
-                "path": "readme",
-                "children": []
-            },
-            {
-                "title": "设备硬件",
-                "path": "device-hardware",
-                "children": [
-                    {"title": "CUDA (设备架构)", "path": "device-hardware/cuda-device-architecture"},
-                    {"title": "流式多处理器 (SM)", "path": "device-hardware/streaming-multiprocessor"},
-                    {"title": "核心 (Core)", "path": "device-hardware/core"},
-                    {"title": "特殊函数单元 (SFU)", "path": "device-hardware/special-function-unit"},
-                    {"title": "加载/存储单元 (LSU)", "path": "device-hardware/load-store-unit"},
-                    {"title": "Warp调度器", "path": "device-hardware/warp-scheduler"},
-                    {"title": "CUDA核心", "path": "device-hardware/cuda-core"},
-                    {"title": "Tensor核心", "path": "device-hardware/tensor-core"},
-                    {"title": "Tensor内存加速器 (TMA)", "path": "device-hardware/tensor-memory-accelerator"},
-                    {"title": "流式多处理器架构", "path": "device-hardware/streaming-multiprocessor-architecture"},
-                    {"title": "纹理处理簇 (TPC)", "path": "device-hardware/texture-processing-cluster"},
-                    {"title": "图形/GPU处理簇 (GPC)", "path": "device-hardware/graphics-processing-cluster"},
-                    {"title": "寄存器文件", "path": "device-hardware/register-file"},
-                    {"title": "L1数据缓存", "path": "device-hardware/l1-data-cache"},
-                    {"title": "Tensor内存", "path": "device-hardware/tensor-memory"},
-                    {"title": "GPU内存 (RAM)", "path": "device-hardware/gpu-ram"},
-                ]
-            },
-            {
-                "title": "设备软件",
-                "path": "device-software",
-                "children": [
-                    {"title": "CUDA (编程模型)", "path": "device-software/cuda-programming-model"},
-                    {"title": "流式汇编器 (SASS)", "path": "device-software/streaming-assembler"},
-                    {"title": "并行线程执行 (PTX)", "path": "device-software/parallel-thread-execution"},
-                    {"title": "计算能力", "path": "device-software/compute-capability"},
-                    {"title": "线程 (Thread)", "path": "device-software/thread"},
-                    {"title": "线程束 (Warp)", "path": "device-software/warp"},
-                    {"title": "协作线程数组 (CTA)", "path": "device-software/cooperative-thread-array"},
-                    {"title": "内核 (Kernel)", "path": "device-software/kernel"},
-                    {"title": "线程块", "path": "device-software/thread-block"},
-                    {"title": "线程块网格", "path": "device-software/thread-block-grid"},
-                    {"title": "线程层次结构", "path": "device-software/thread-hierarchy"},
-                    {"title": "内存层次结构", "path": "device-software/memory-hierarchy"},
-                    {"title": "寄存器 (Registers)", "path": "device-software/registers"},
-                    {"title": "共享内存", "path": "device-software/shared-memory"},
-                    {"title": "全局内存", "path": "device-software/global-memory"},
-                ]
-            },
-            {
-                "title": "主机软件",
-                "path": "host-software",
-                "children": [
-                    {"title": "CUDA (软件平台)", "path": "host-software/cuda-software-platform"},
-                    {"title": "CUDA C++", "path": "host-software/cuda-c"},
-                    {"title": "NVIDIA GPU 驱动", "path": "host-software/nvidia-gpu-drivers"},
-                    {"title": "nvidia.ko", "path": "host-software/nvidia-ko"},
-                    {"title": "CUDA 驱动 API", "path": "host-software/cuda-driver-api"},
-                    {"title": "libcuda.so", "path": "host-software/libcuda"},
-                    {"title": "NVIDIA 管理库 (NVML)", "path": "host-software/nvml"},
-                    {"title": "libnvml.so", "path": "host-software/libnvml"},
-                    {"title": "nvidia-smi", "path": "host-software/nvidia-smi"},
-                    {"title": "CUDA 运行时 API", "path": "host-software/cuda-runtime-api"},
-                    {"title": "libcudart.so", "path": "host-software/libcudart"},
-                    {"title": "nvcc 编译器", "path": "host-software/nvcc"},
-                    {"title": "NVRTC 运行时编译器", "path": "host-software/nvrtc"},
-                    {"title": "CUPTI 性能分析接口", "path": "host-software/cupti"},
-                    {"title": "Nsight Systems", "path": "host-software/nsight-systems"},
-                    {"title": "CUDA 二进制工具", "path": "host-software/cuda-binary-utilities"},
-                    {"title": "cuBLAS", "path": "host-software/cublas"},
-                    {"title": "cuDNN", "path": "host-software/cudnn"},
-                ]
-            },
-            {
-                "title": "性能",
-                "path": "perf",
-                "children": [
-                    {"title": "性能瓶颈", "path": "perf/performance-bottleneck"},
-                    {"title": "屋顶线模型", "path": "perf/roofline-model"},
-                    {"title": "计算受限", "path": "perf/compute-bound"},
-                    {"title": "内存受限", "path": "perf/memory-bound"},
-                    {"title": "算术强度", "path": "perf/arithmetic-intensity"},
-                    {"title": "开销 (Overhead)", "path": "perf/overhead"},
-                    {"title": "利特尔定律", "path": "perf/littles-law"},
-                    {"title": "内存带宽", "path": "perf/memory-bandwidth"},
-                    {"title": "算术带宽", "path": "perf/arithmetic-bandwidth"},
-                    {"title": "延迟隐藏", "path": "perf/latency-hiding"},
-                    {"title": "Warp执行状态", "path": "perf/warp-execution-state"},
-                    {"title": "活跃周期", "path": "perf/active-cycle"},
-                    {"title": "占用率 (Occupancy)", "path": "perf/occupancy"},
-                    {"title": "流水线利用率", "path": "perf/pipe-utilization"},
-                    {"title": "峰值速率", "path": "perf/peak-rate"},
-                    {"title": "发射效率", "path": "perf/issue-efficiency"},
-                    {"title": "SM利用率", "path": "perf/streaming-multiprocessor-utilization"},
-                    {"title": "Warp分歧", "path": "perf/warp-divergence"},
-                    {"title": "分支效率", "path": "perf/branch-efficiency"},
-                    {"title": "内存合并", "path": "perf/memory-coalescing"},
-                    {"title": "Bank冲突", "path": "perf/bank-conflict"},
-                    {"title": "寄存器压力", "path": "perf/register-pressure"},
-                ]
-            },
-        ]
-    
-    def _get_html_template(self, title: str, nav_html: str, content_html: str) -> str:
-        """生成HTML模板"""
-        return f"""<!DOCTYPE html>
+    Returns:
+        (错误信息，成功时为 None；本页各阶段耗时)
+    """
+    md_file, html_file = task
+    error = None
+    try:
+        _worker_generator.generate_page(md_file, html_file, verbose=False)
+    except Exception:
+        error = traceback.format_exc()
+    return error, take_phase_timings()
+
+
+# 默认页面模板（string.Template 语法：$title, $stylesheet, $search_script, $site_root, $nav_html, $content_html, $backlinks_html）
+DEFAULT_PAGE_TEMPLATE = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <meta name="referrer" content="no-referrer">
-    <title>{title} - GPU Glossary 中文版</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'PingFang SC', 'Hiragino Sans GB', 'Microsoft YaHei', sans-serif;
-            line-height: 1.6;
-            color: #e0e0e0;
-            background: #0d1117;
-        }}
-        
-        .container {{
-            display: flex;
-            min-height: 100vh;
-        }}
-        
-        .sidebar {{
-            width: 280px;
-            background: #161b22;
-            border-right: 1px solid #30363d;
-            position: fixed;
-            height: 100vh;
-            overflow-y: auto;
-            padding: 20px;
-        }}
-        
-        .sidebar h1 {{
-            color: #58a6ff;
-            font-size: 1.5em;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #30363d;
-        }}
-        
-        .sidebar nav ul {{
-            list-style: none;
-        }}
-        
-        .sidebar nav > ul > li {{
-            margin-bottom: 15px;
-        }}
-        
-        .sidebar nav a {{
-            color: #8b949e;
-            text-decoration: none;
-            display: block;
-            padding: 5px 10px;
-            border-radius: 6px;
-            transition: all 0.2s;
-        }}
-        
-        .sidebar nav a:hover {{
-            background: #21262d;
-            color: #58a6ff;
-        }}
-        
-        .sidebar nav > ul > li > a {{
-            font-weight: 600;
-            color: #c9d1d9;
-        }}
-        
-        .sidebar nav ul ul {{
-            margin-left: 15px;
-            margin-top: 5px;
-        }}
-        
-        .sidebar nav ul ul li {{
-            margin: 3px 0;
-        }}
-        
-        .sidebar nav ul ul a {{
-            font-size: 0.9em;
-            padding: 3px 10px;
-        }}
-        
-        .content {{
-            flex: 1;
-            margin-left: 280px;
-            padding: 40px 60px;
-            max-width: 900px;
-        }}
-        
-        .content h1 {{
-            color: #c9d1d9;
-            font-size: 2.5em;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #30363d;
-        }}
-        
-        .content h2 {{
-            color: #c9d1d9;
-            font-size: 1.8em;
-            margin-top: 30px;
-            margin-bottom: 15px;
-        }}
-        
-        .content h3 {{
-            color: #c9d1d9;
-            font-size: 1.3em;
-            margin-top: 25px;
-            margin-bottom: 10px;
-        }}
-        
-        .content p {{
-            margin-bottom: 15px;
-            color: #c9d1d9;
-        }}
-        
-        .content a {{
-            color: #58a6ff;
-            text-decoration: none;
-        }}
-        
-        .content a:hover {{
-            text-decoration: underline;
-        }}
-        
-        .content code {{
-            background: #161b22;
-            padding: 2px 6px;
-            border-radius: 3px;
-            font-family: 'Consolas', 'Monaco', monospace;
-            font-size: 0.9em;
-            color: #79c0ff;
-        }}
-        
-        .content pre {{
-            background: #161b22;
-            padding: 15px;
-            border-radius: 6px;
-            overflow-x: auto;
-            margin: 15px 0;
-            border: 1px solid #30363d;
-        }}
-        
-        .content pre code {{
-            background: none;
-            padding: 0;
-            color: #c9d1d9;
-        }}
-        
-        .content ul, .content ol {{
-            margin-left: 25px;
-            margin-bottom: 15px;
-        }}
-        
-        .content li {{
-            margin-bottom: 8px;
-        }}
-        
-        .content blockquote {{
-            border-left: 4px solid #58a6ff;
-            padding-left: 15px;
-            margin: 15px 0;
-            color: #8b949e;
-            font-style: italic;
-        }}
-        
-        .content table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 15px 0;
-        }}
-        
-        .content th, .content td {{
-            border: 1px solid #30363d;
-            padding: 10px;
-            text-align: left;
-        }}
-        
-        .content th {{
-            background: #161b22;
-            font-weight: 600;
-        }}
-        
-        .meta-info {{
-            background: #161b22;
-            border: 1px solid #30363d;
-            border-radius: 6px;
-            padding: 15px;
-            margin-bottom: 30px;
-            font-size: 0.9em;
-            color: #8b949e;
-        }}
-        
-        /* 图片容器样式 */
-        .image-container {{
-            margin: 30px 0;
-            text-align: center;
-            background: #161b22;
-            border: 1px solid #30363d;
-            border-radius: 8px;
-            padding: 20px;
-        }}
-        
-        .image-container img {{
-            max-width: 100%;
-            height: auto;
-            border-radius: 4px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-        }}
-        
-        .image-caption {{
-            margin-top: 15px;
-            color: #8b949e;
-            font-size: 0.9em;
-            font-style: italic;
-            line-height: 1.5;
-        }}
-        
-        .footer {{
-            margin-top: 60px;
-            padding-top: 20px;
-            border-top: 1px solid #30363d;
-            text-align: center;
-            color: #8b949e;
-            font-size: 0.9em;
-        }}
-        
-        @media (max-width: 768px) {{
-            .sidebar {{
-                width: 100%;
-                position: relative;
-                height: auto;
-                border-right: none;
-                border-bottom: 1px solid #30363d;
-            }}
-            
-            .content {{
-                margin-left: 0;
-                padding: 20px;
-            }}
-        }}
-    </style>
+    <title>$title - GPU Glossary 中文版</title>
+    <link rel="stylesheet" href="$stylesheet">
 </head>
 <body>
     <div class="container">
         <aside class="sidebar">
             <h1>GPU Glossary</h1>
             <p style="color: #8b949e; font-size: 0.9em; margin-bottom: 20px;">中文版</p>
+            <div class="search">
+                <input type="search" id="search-input" placeholder="搜索术语..." autocomplete="off">
+                <ul id="search-results"></ul>
+            </div>
             <nav>
-                {nav_html}
+                $nav_html
             </nav>
         </aside>
         
         <main class="content">
-            {content_html}
+            $content_html
+            $backlinks_html
             
             <div class="footer">
                 <p>原项目: <a href="https://modal.com/gpu-glossary" target="_blank">Modal GPU Glossary</a></p>
@@ -391,17 +159,563 @@ class WebsiteGenerator:
             </div>
         </main>
     </div>
+    <script src="$search_script" data-root="$site_root" defer></script>
 </body>
 </html>"""
+
+# 默认样式表，构建时写出为 style.<hash>.css 供所有页面共享
+DEFAULT_CSS = """* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'PingFang SC', 'Hiragino Sans GB', 'Microsoft YaHei', sans-serif;
+    line-height: 1.6;
+    color: #e0e0e0;
+    background: #0d1117;
+}
+
+.container {
+    display: flex;
+    min-height: 100vh;
+}
+
+.sidebar {
+    width: 280px;
+    background: #161b22;
+    border-right: 1px solid #30363d;
+    position: fixed;
+    height: 100vh;
+    overflow-y: auto;
+    padding: 20px;
+}
+
+.sidebar h1 {
+    color: #58a6ff;
+    font-size: 1.5em;
+    margin-bottom: 20px;
+    padding-bottom: 10px;
+    border-bottom: 2px solid #30363d;
+}
+
+.sidebar nav ul {
+    list-style: none;
+}
+
+.sidebar nav > ul > li {
+    margin-bottom: 15px;
+}
+
+.sidebar nav a {
+    color: #8b949e;
+    text-decoration: none;
+    display: block;
+    padding: 5px 10px;
+    border-radius: 6px;
+    transition: all 0.2s;
+}
+
+.sidebar nav a:hover {
+    background: #21262d;
+    color: #58a6ff;
+}
+
+.sidebar nav > ul > li > a {
+    font-weight: 600;
+    color: #c9d1d9;
+}
+
+.sidebar nav ul ul {
+    margin-left: 15px;
+    margin-top: 5px;
+}
+
+.sidebar nav ul ul li {
+    margin: 3px 0;
+}
+
+.sidebar nav ul ul a {
+    font-size: 0.9em;
+    padding: 3px 10px;
+}
+
+.content {
+    flex: 1;
+    margin-left: 280px;
+    padding: 40px 60px;
+    max-width: 900px;
+}
+
+.content h1 {
+    color: #c9d1d9;
+    font-size: 2.5em;
+    margin-bottom: 20px;
+    padding-bottom: 10px;
+    border-bottom: 2px solid #30363d;
+}
+
+.content h2 {
+    color: #c9d1d9;
+    font-size: 1.8em;
+    margin-top: 30px;
+    margin-bottom: 15px;
+}
+
+.content h3 {
+    color: #c9d1d9;
+    font-size: 1.3em;
+    margin-top: 25px;
+    margin-bottom: 10px;
+}
+
+.content p {
+    margin-bottom: 15px;
+    color: #c9d1d9;
+}
+
+.content a {
+    color: #58a6ff;
+    text-decoration: none;
+}
+
+.content a:hover {
+    text-decoration: underline;
+}
+
+.content code {
+    background: #161b22;
+    padding: 2px 6px;
+    border-radius: 3px;
+    font-family: 'Consolas', 'Monaco', monospace;
+    font-size: 0.9em;
+    color: #79c0ff;
+}
+
+.content pre {
+    background: #161b22;
+    padding: 15px;
+    border-radius: 6px;
+    overflow-x: auto;
+    margin: 15px 0;
+    border: 1px solid #30363d;
+}
+
+.content pre code {
+    background: none;
+    padding: 0;
+    color: #c9d1d9;
+}
+
+.content ul, .content ol {
+    margin-left: 25px;
+    margin-bottom: 15px;
+}
+
+.content li {
+    margin-bottom: 8px;
+}
+
+.content blockquote {
+    border-left: 4px solid #58a6ff;
+    padding-left: 15px;
+    margin: 15px 0;
+    color: #8b949e;
+    font-style: italic;
+}
+
+.content table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 15px 0;
+}
+
+.content th, .content td {
+    border: 1px solid #30363d;
+    padding: 10px;
+    text-align: left;
+}
+
+.content th {
+    background: #161b22;
+    font-weight: 600;
+}
+
+.meta-info {
+    background: #161b22;
+    border: 1px solid #30363d;
+    border-radius: 6px;
+    padding: 15px;
+    margin-bottom: 30px;
+    font-size: 0.9em;
+    color: #8b949e;
+}
+
+/* 图片容器样式 */
+.image-container {
+    margin: 30px 0;
+    text-align: center;
+    background: #161b22;
+    border: 1px solid #30363d;
+    border-radius: 8px;
+    padding: 20px;
+}
+
+.image-container img {
+    max-width: 100%;
+    height: auto;
+    border-radius: 4px;
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
+}
+
+.image-caption {
+    margin-top: 15px;
+    color: #8b949e;
+    font-size: 0.9em;
+    font-style: italic;
+    line-height: 1.5;
+}
+
+.backlinks {
+    margin-top: 40px;
+    padding-top: 20px;
+    border-top: 1px solid #30363d;
+}
+
+.backlinks h2 {
+    color: #8b949e;
+    font-size: 1.1em;
+    margin-bottom: 10px;
+}
+
+.backlinks ul {
+    margin-left: 20px;
+    color: #8b949e;
+}
+
+.search {
+    margin-bottom: 20px;
+}
+
+.search input {
+    width: 100%;
+    padding: 6px 10px;
+    background: #0d1117;
+    border: 1px solid #30363d;
+    border-radius: 6px;
+    color: #c9d1d9;
+    font-size: 0.9em;
+}
+
+.search input:focus {
+    outline: none;
+    border-color: #58a6ff;
+}
+
+.search ul {
+    list-style: none;
+    margin-top: 8px;
+}
+
+.search li a {
+    color: #58a6ff;
+    text-decoration: none;
+    display: block;
+    padding: 3px 10px;
+    border-radius: 6px;
+    font-size: 0.9em;
+}
+
+.search li a:hover {
+    background: #21262d;
+}
+
+.search .search-empty {
+    color: #8b949e;
+    font-size: 0.9em;
+    padding: 3px 10px;
+}
+
+.footer {
+    margin-top: 60px;
+    padding-top: 20px;
+    border-top: 1px solid #30363d;
+    text-align: center;
+    color: #8b949e;
+    font-size: 0.9em;
+}
+
+@media (max-width: 768px) {
+    .sidebar {
+        width: 100%;
+        position: relative;
+        height: auto;
+        border-right: none;
+        border-bottom: 1px solid #30363d;
+    }
+
+    .content {
+        margin-left: 0;
+        padding: 20px;
+    }
+}
+"""
+
+
+class PageContext:
+    """单个页面在后处理阶段共用的信息，每个页面只计算一次"""
+    
+    def __init__(self, rel_path: Path):
+        self.rel_path = rel_path  # 相对输入目录的路径，例如 perf/occupancy.md
+        # 从当前页面回到站点根目录的相对前缀，例如 "../"
+        self.link_prefix = '../' * (len(rel_path.parts) - 1)
+
+
+# 改写规则处理函数：接收规则自身的捕获组和页面信息，返回替换文本
+RewriteHandler = Callable[[Tuple[Optional[str], ...], PageContext, "HtmlPostProcessor"], str]
+
+
+class HtmlPostProcessor:
+    """
+    Markdown 转换后的 HTML 改写流水线
+    
+    所有规则合并为一个预编译的正则（按注册顺序排列的分支），
+    每个页面只扫描一遍 HTML。注册新规则不会增加额外的全文扫描。
+    """
+    
+    def __init__(self, rules: Optional[List[Tuple[str, str, RewriteHandler]]] = None):
+        self._rules: List[Tuple[str, str, RewriteHandler]] = []
+        self._pattern: Optional[re.Pattern] = None
+        self._dispatch: Dict[str, Tuple[int, int, RewriteHandler]] = {}
+        for name, pattern, handler in rules or []:
+            self.register(name, pattern, handler)
+    
+    def register(self, name: str, pattern: str, handler: RewriteHandler):
+        """
+        注册改写规则
+        
+        Args:
+            name: 规则名（需唯一）
+            pattern: 正则表达式，需要的标志请用内联写法，例如 (?s:...)
+            handler: 处理函数，参数为 (规则自身的捕获组, 页面信息, 后处理器)
+        
+        同一位置有多条规则可以匹配时，先注册的规则优先
+        """
+        if any(rule[0] == name for rule in self._rules):
+            raise ValueError(f"重复的改写规则: {name}")
+        self._rules.append((name, pattern, handler))
+        self._pattern = None
+    
+    def _compile(self) -> re.Pattern:
+        """把所有规则合并为一个正则，并记录每条规则捕获组的位置"""
+        branches = []
+        self._dispatch = {}
+        offset = 1
+        for index, (name, pattern, handler) in enumerate(self._rules):
+            group_count = re.compile(pattern).groups
+            key = f"_rule{index}"
+            branches.append(f"(?P<{key}>{pattern})")
+            # 外层分组占一个编号，规则自身的捕获组紧随其后
+            self._dispatch[key] = (offset + 1, offset + 1 + group_count, handler)
+            offset += 1 + group_count
+        self._pattern = re.compile('|'.join(branches)) if branches else re.compile(r'(?!)')
+        return self._pattern
+    
+    def process(self, html: str, page: PageContext) -> str:
+        """对 HTML（或其中的片段）应用所有改写规则"""
+        pattern = self._pattern or self._compile()
+        
+        def replace(match):
+            start, end, handler = self._dispatch[match.lastgroup]
+            groups = tuple(match.group(i) for i in range(start, end))
+            return handler(groups, page, self)
+        
+        return pattern.sub(replace, html)
+
+
+def _rewrite_glossary_link(groups, page: PageContext, processor: HtmlPostProcessor) -> str:
+    """/gpu-glossary/device-hardware/xxx -> ../device-hardware/xxx.html"""
+    return f'href="{page.link_prefix}{groups[0]}.html"'
+
+
+def _rewrite_image_with_caption(groups, page: PageContext, processor: HtmlPostProcessor) -> str:
+    """<p><img/></p> + <blockquote> 组合转换为带说明的图片容器"""
+    alt_text = groups[0] or ""
+    img_url = groups[1]
+    # 清理 caption 中的 <p> 标签；说明中的链接同样需要改写
+    caption = processor.process(_P_TAG.sub('', groups[2]).strip(), page)
+    
+    return f'''<div class="image-container">
+    <img src="{img_url}" alt="{alt_text}" loading="lazy" />
+    <p class="image-caption">{caption}</p>
+</div>'''
+
+
+def _rewrite_image(groups, page: PageContext, processor: HtmlPostProcessor) -> str:
+    """没有说明的单独图片转换为图片容器，alt 文本作为说明"""
+    alt_text = groups[0] or ""
+    img_url = groups[1]
+    
+    return f'''<div class="image-container">
+    <img src="{img_url}" alt="{alt_text}" loading="lazy" />
+    {f'<p class="image-caption">{alt_text}</p>' if alt_text else ''}
+</div>'''
+
+
+_P_TAG = re.compile(r'</?p>')
+
+# 默认改写规则（顺序即优先级：图片+说明必须排在单独图片之前）
+DEFAULT_REWRITE_RULES: List[Tuple[str, str, RewriteHandler]] = [
+    ("glossary-link", r'href="/gpu-glossary/([^"]+)"', _rewrite_glossary_link),
+    ("image-with-caption",
+     r'(?s:<p><img\s+alt="([^"]*)"\s+src="(https?://[^"]+)"\s*/></p>\s*<blockquote>\s*<p>(.*?)</p>\s*</blockquote>)',
+     _rewrite_image_with_caption),
+    ("image", r'<p><img\s+alt="([^"]*)"\s+src="(https?://[^"]+)"\s*/></p>', _rewrite_image),
+]
+
+
+class WebsiteGenerator:
+    """静态网站生成器"""
+    
+    def __init__(self, input_dir: Path, output_dir: Path, base_path: str = "/gpu-glossary-zh/",
+                 template_dir: Optional[Path] = None):
+        """
+        Args:
+            input_dir: Markdown 源文件目录
+            output_dir: 网站输出目录
+            base_path: GitHub Pages 的基础路径
+            template_dir: 自定义模板目录，可包含 page.html 和 style.css，缺少的文件使用内置默认值
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.base_path = base_path  # GitHub Pages 的基础路径
+        self.page_template, self.css = self._load_templates(template_dir)
+        # 样式表和脚本文件名带内容指纹，内容不变时浏览器可以长期缓存
+        self.stylesheet_name = f"style.{_sha256(self.css.encode('utf-8'))[:12]}.css"
+        self.search_script_name = f"search.{_sha256(SEARCH_JS.encode('utf-8'))[:12]}.js"
+        self._template_parts = self._split_template(self.page_template)
+        # 只读取 front matter 的元数据索引，缓存在输出目录中
+        self.metadata = PageMetadataIndex(input_dir, output_dir / METADATA_CACHE_NAME)
+        self.nav_structure = self._build_nav_structure()
+        self._nav_cache: Optional[Tuple[bytes, Dict[str, List[int]]]] = None  # 见 _nav_bytes
+        self.timings: Dict[str, float] = {}  # 最近一次构建的各阶段耗时（所有 worker 合计）
+        self.postprocessor = HtmlPostProcessor(DEFAULT_REWRITE_RULES)
+        # 页面之间的交叉引用，generate_all 遍历源文件时建立，用于"被以下页面引用"列表
+        self.link_graph = LinkGraph()
+        self.broken_links: List[Tuple[str, int, str]] = []  # 最近一次构建发现的断开链接
+        # 最近一次构建的搜索索引，开发服务器用它只重新索引变化的页面（streaming 构建不保留）
+        self.search_index: Optional[SearchIndexBuilder] = None
+    
+    @staticmethod
+    def _load_templates(template_dir: Optional[Path]) -> Tuple[Template, str]:
+        """加载页面模板和样式表"""
+        page_template = DEFAULT_PAGE_TEMPLATE
+        css = DEFAULT_CSS
+        if template_dir is not None:
+            page_file = template_dir / "page.html"
+            css_file = template_dir / "style.css"
+            if page_file.exists():
+                page_template = page_file.read_text(encoding='utf-8')
+            if css_file.exists():
+                css = css_file.read_text(encoding='utf-8')
+        return Template(page_template), css
+    
+    def _build_nav_structure(self) -> List[Dict]:
+        """根据各页面 front matter 中的 title / nav_title / nav_order / nav_exclude 构建导航结构"""
+        self.metadata.refresh()
+        return self.metadata.build_nav()
+    
+    @staticmethod
+    def _split_template(template: Template) -> List[Tuple[bytes, Optional[str]]]:
+        """
+        把页面模板切分为 [(编码后的字面文本, 其后的占位符名), ...]，每次构建只做一次
+        
+        页面按这些片段直接写入文件，不再拼接出整页字符串
+        """
+        text = template.template
+        parts: List[Tuple[bytes, Optional[str]]] = []
+        literal = ""
+        last = 0
+        for match in template.pattern.finditer(text):
+            literal += text[last:match.start()]
+            last = match.end()
+            if match.group('escaped') is not None:
+                literal += template.delimiter
+                continue
+            name = match.group('named') or match.group('braced')
+            if name is None:
+                raise ValueError(f"页面模板第 {text.count(chr(10), 0, match.start()) + 1} 行有无效的占位符")
+            parts.append((literal.encode('utf-8'), name))
+            literal = ""
+        parts.append(((literal + text[last:]).encode('utf-8'), None))
+        return parts
+    
+    def _write_page(self, fh, title: str, current_path: str, content_html: str, site_root: str = "",
+                    backlinks_html: str = ""):
+        """
+        按模板片段把页面直接写入二进制文件句柄
+        
+        导航、模板填充和写入分别计时（nav / template / write），与整页拼接时的阶段划分一致
+        
+        Args:
+            current_path: 当前页面路径（不含扩展名），用于高亮导航
+            site_root: 从当前页面回到站点根目录的相对前缀，用于引用样式表和脚本
+        """
+        with _timed('template'):
+            values = {
+                "title": title,
+                "stylesheet": site_root + self.stylesheet_name,
+                "search_script": site_root + self.search_script_name,
+                "site_root": site_root,
+                "content_html": content_html,
+                "backlinks_html": backlinks_html,
+            }
+            values = {key: value.encode('utf-8') for key, value in values.items()}
+        for literal, name in self._template_parts:
+            if name == "nav_html":
+                with _timed('write'):
+                    fh.write(literal)
+                with _timed('nav'):
+                    self._write_nav(fh, current_path)
+                continue
+            with _timed('write'):
+                fh.write(literal)
+                if name is not None:
+                    if name not in values:
+                        raise KeyError(name)
+                    fh.write(values[name])
     
-    def _generate_nav_html(self, current_path: str = "") -> str:
-        """生成导航HTML"""
+    def write_assets(self):
+        """写出带指纹的样式表和搜索脚本，并删除旧版本"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        assets = {
+            self.stylesheet_name: ("style.*.css", self.css),
+            self.search_script_name: ("search.*.js", SEARCH_JS),
+        }
+        for name, (pattern, content) in assets.items():
+            for old in self.output_dir.glob(pattern):
+                if old.name != name:
+                    old.unlink()
+            asset_file = self.output_dir / name
+            if not asset_file.exists():
+                with open(asset_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+    
+    def _render_nav_fragment(self) -> Tuple[str, Dict[str, List[int]]]:
+        """
+        渲染不带高亮的导航HTML（每次构建只渲染一次）
+        
+        Returns:
+            (导航HTML, {页面路径: 高亮样式插入位置列表})
+        """
         html = ["<ul>"]
+        # 记录每个可高亮链接在 html 列表中的下标，以及在该行中样式的插入位置
+        markers: List[Tuple[str, int, int]] = []
         
         for item in self.nav_structure:
             path = item['path']
             title = item['title']
-            is_current = (path == current_path)
             
             if item.get('children'):
                 html.append(f'<li>')
@@ -412,147 +726,490 @@ class WebsiteGenerator:
                 for child in item['children']:
                     child_path = child['path']
                     child_title = child['title']
-                    is_child_current = (child_path == current_path)
-                    style = ' style="color: #58a6ff; font-weight: bold;"' if is_child_current else ''
                     # 使用绝对路径（带 base_path）
-                    html.append(f'<li><a href="{self.base_path}{child_path}.html"{style}>{child_title}</a></li>')
+                    head = f'<li><a href="{self.base_path}{child_path}.html"'
+                    markers.append((child_path, len(html), len(head)))
+                    html.append(f'{head}>{child_title}</a></li>')
                 
                 html.append('</ul>')
                 html.append('</li>')
             else:
-                style = ' style="color: #58a6ff; font-weight: bold;"' if is_current else ''
                 # 使用绝对路径（带 base_path）
-                html.append(f'<li><a href="{self.base_path}{path}.html"{style}>{title}</a></li>')
+                head = f'<li><a href="{self.base_path}{path}.html"'
+                markers.append((path, len(html), len(head)))
+                html.append(f'{head}>{title}</a></li>')
         
         html.append("</ul>")
-        return '\n'.join(html)
-    
-    def _markdown_to_html(self, md_content: str, current_file: Path) -> str:
-        """将Markdown转换为HTML"""
-        # 移除元信息注释
-        md_content = re.sub(r'<!--.*?-->', '', md_content, flags=re.DOTALL)
         
-        # 转换Markdown
-        md = markdown.Markdown(extensions=[
-            'extra',
-            'codehilite',
-            'toc',
-            'tables',
-            'fenced_code'
-        ])
-        
-        html = md.convert(md_content)
-        
-        # 修复链接：将 /gpu-glossary/ 开头的链接转换为相对路径
-        # 例如：/gpu-glossary/device-hardware/xxx -> ../device-hardware/xxx.html 或 device-hardware/xxx.html
-        def fix_link(match):
-            original_url = match.group(1)
-            
-            # 只处理 /gpu-glossary/ 开头的链接
-            if original_url.startswith('/gpu-glossary/'):
-                # 移除 /gpu-glossary/ 前缀
-                relative_path = original_url.replace('/gpu-glossary/', '')
-                
-                # 计算当前文件的深度
-                current_depth = len(current_file.relative_to(self.input_dir).parts) - 1
-                
-                # 添加 ../ 前缀
-                if current_depth > 0:
-                    prefix = '../' * current_depth
-                    fixed_url = prefix + relative_path + '.html'
-                else:
-                    fixed_url = relative_path + '.html'
-                
-                return f'href="{fixed_url}"'
-            
-            return match.group(0)
+        # 把 (行下标, 行内位置) 换算成整段HTML中的偏移
+        line_starts = []
+        offset = 0
+        for line in html:
+            line_starts.append(offset)
+            offset += len(line) + 1  # '\n' 分隔符
         
-        # 替换所有 href="/gpu-glossary/..." 的链接
-        html = re.sub(r'href="(/gpu-glossary/[^"]+)"', fix_link, html)
+        positions: Dict[str, List[int]] = {}
+        for path, line_index, column in markers:
+            positions.setdefault(path, []).append(line_starts[line_index] + column)
         
-        # 处理图片 + blockquote 组合（图片说明）
-        # 匹配：<p><img .../></p>\n<blockquote>...</blockquote>
-        def fix_image_with_caption(match):
-            alt_text = match.group(1) if match.group(1) else ""
-            img_url = match.group(2)
-            caption = match.group(3)  # blockquote 内的内容
-            
-            # 清理 caption 中的 <p> 标签
-            caption = re.sub(r'</?p>', '', caption).strip()
-            
-            return f'''<div class="image-container">
-    <img src="{img_url}" alt="{alt_text}" loading="lazy" />
-    <p class="image-caption">{caption}</p>
-</div>'''
+        return '\n'.join(html), positions
+    
+    def _nav_bytes(self) -> Tuple[bytes, Dict[str, List[int]]]:
+        """
+        编码后的导航片段和每个页面高亮样式的字节偏移
         
-        # 先处理图片+说明的组合
-        html = re.sub(
-            r'<p><img\s+alt="([^"]*)"\s+src="(https?://[^"]+)"\s*/></p>\s*<blockquote>\s*<p>(.*?)</p>\s*</blockquote>',
-            fix_image_with_caption,
-            html,
-            flags=re.DOTALL
-        )
-        
-        # 处理没有说明的单独图片
-        def fix_image_without_caption(match):
-            alt_text = match.group(1) if match.group(1) else ""
-            img_url = match.group(2)
-            
-            return f'''<div class="image-container">
-    <img src="{img_url}" alt="{alt_text}" loading="lazy" />
-    {f'<p class="image-caption">{alt_text}</p>' if alt_text else ''}
-</div>'''
+        导航片段只渲染一次并缓存。修改 nav_structure 或 base_path 后需要把 self._nav_cache 置为 None
+        """
+        if self._nav_cache is None:
+            nav_html, positions = self._render_nav_fragment()
+            # 字符偏移换算成字节偏移：按位置顺序逐段累加编码长度
+            byte_offsets: Dict[int, int] = {}
+            last = 0
+            offset = 0
+            for pos in sorted({pos for plist in positions.values() for pos in plist}):
+                offset += len(nav_html[last:pos].encode('utf-8'))
+                byte_offsets[pos] = offset
+                last = pos
+            self._nav_cache = (
+                nav_html.encode('utf-8'),
+                {path: [byte_offsets[pos] for pos in plist] for path, plist in positions.items()},
+            )
+        return self._nav_cache
+    
+    def _write_nav(self, fh, current_path: str = ""):
+        """
+        写出导航HTML，只在当前项的位置插入高亮样式
         
-        html = re.sub(
-            r'<p><img\s+alt="([^"]*)"\s+src="(https?://[^"]+)"\s*/></p>',
-            fix_image_without_caption,
-            html
-        )
+        各页面共享同一份编码后的导航，按 memoryview 切片写出，不复制整段导航
+        """
+        nav, positions = self._nav_bytes()
+        view = memoryview(nav)
+        last = 0
+        for pos in positions.get(current_path, ()):
+            fh.write(view[last:pos])
+            fh.write(NAV_HIGHLIGHT_STYLE)
+            last = pos
+        fh.write(view[last:])
+    
+    def _markdown_to_html(self, md_content: str, current_file: Path) -> str:
+        """将Markdown转换为HTML"""
+        # 转换Markdown（复用当前 worker 的转换器；调用方已移除元信息注释和 front matter）
+        md = get_markdown_converter()
+        with _timed('markdown_convert'):
+            html = md.reset().convert(md_content)
         
-        return html
+        # 修复链接和图片（单次扫描完成所有改写规则）
+        with _timed('postprocess'):
+            page = PageContext(current_file.relative_to(self.input_dir))
+            return self.postprocessor.process(html, page)
     
-    def generate_page(self, md_file: Path, html_file: Path):
+    def generate_page(self, md_file: Path, html_file: Path, verbose: bool = True):
         """生成单个HTML页面"""
         # 读取Markdown
-        with open(md_file, 'r', encoding='utf-8') as f:
+        with _timed('read'), open(md_file, 'r', encoding='utf-8') as f:
             md_content = f.read()
         
-        # 提取标题
+        # 移除元信息注释和 front matter，标题优先取 front matter 中的 title
+        md_content = re.sub(r'<!--.*?-->', '', md_content, flags=re.DOTALL)
+        meta, md_content = split_front_matter(md_content)
         title_match = re.search(r'^#\s+(.+)$', md_content, re.MULTILINE)
-        title = title_match.group(1) if title_match else md_file.stem
+        title = meta.get('title') or (title_match.group(1) if title_match else md_file.stem)
         
         # 转换为HTML（传入当前文件路径用于修复链接）
         content_html = self._markdown_to_html(md_content, md_file)
+        if meta.get('title') and not title_match:
+            content_html = f'<h1>{escape(meta["title"])}</h1>\n{content_html}'
         
         # 计算相对路径用于导航
         rel_path = md_file.relative_to(self.input_dir).with_suffix('')
         path_str = str(rel_path).replace('\\', '/')
         
-        # 生成导航
-        nav_html = self._generate_nav_html(path_str)
+        # 按模板片段直接写入文件；样式表和脚本使用相对路径，本地和 GitHub Pages 都能访问
+        with _timed('template'):
+            site_root = '../' * (len(rel_path.parts) - 1)
+            backlinks_html = self._backlinks_html(path_str, site_root)
+        # 先写入同目录下的临时文件，写完后原子替换，中途出错不会留下截断的页面
+        tmp_file = html_file.with_name(html_file.name + '.tmp')
+        with _timed('write'):
+            html_file.parent.mkdir(parents=True, exist_ok=True)
+            f = open(tmp_file, 'wb')
+        try:
+            try:
+                self._write_page(f, title, path_str, content_html, site_root, backlinks_html)
+            finally:
+                with _timed('write'):
+                    f.close()
+            with _timed('write'):
+                os.replace(tmp_file, html_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        
+        if verbose:
+            print(f"✓ 生成: {html_file.relative_to(self.output_dir)}")
+    
+    def _iter_sources(self) -> Iterator[Path]:
+        """
+        惰性遍历 Markdown 源文件
+        
+        每层目录按名称排序后递归，顺序与 sorted(input_dir.rglob("*.md")) 相同，
+        但不需要先把所有路径收集到列表中
+        """
+        for entry in iter_markdown_files(self.input_dir):
+            yield Path(entry.path)
+    
+    def _nav_titles(self) -> Dict[str, str]:
+        """导航中每个页面路径对应的标题"""
+        titles = {}
+        for item in self.nav_structure:
+            titles[item['path']] = item['title']
+            for child in item.get('children', []):
+                titles[child['path']] = child['title']
+        return titles
+    
+    @staticmethod
+    def _page_title(rel_path: Path, page_title: Optional[str], headings: List[str],
+                    nav_titles: Dict[str, str]) -> str:
+        """搜索结果和"被以下页面引用"列表中的标题，优先使用导航中的标题"""
+        return (nav_titles.get(rel_path.with_suffix('').as_posix()) or page_title
+                or (headings[0] if headings else rel_path.stem))
+    
+    def _index_page(self, search_index: SearchIndexBuilder, rel_path: Path, md_content: str,
+                    nav_titles: Dict[str, str]) -> str:
+        """把一个页面加入搜索索引，返回页面标题（front matter 标题取自元数据索引）"""
+        with _timed('search_index'):
+            _, headings, body = extract_text(md_content)
+            page_title = self.metadata.title(rel_path.with_suffix('').as_posix())
+            title = self._page_title(rel_path, page_title, headings, nav_titles)
+            search_index.add_page(rel_path.with_suffix('.html').as_posix(), title, headings, body)
+        return title
+    
+    def _link_page(self, rel_path: Path, md_content: str, title: str) -> Set[str]:
+        """更新页面在交叉引用图中的出链，返回"被引用"列表因此变化的页面"""
+        with _timed('links'):
+            return self.link_graph.set_page(rel_path.with_suffix('').as_posix(), title,
+                                            extract_links(md_content))
+    
+    def update_page_links(self, md_file: Path) -> Set[str]:
+        """
+        重新读取一个源文件并更新交叉引用图（开发服务器在文件变化后调用）
         
-        # 生成完整HTML
-        full_html = self._get_html_template(title, nav_html, content_html)
+        Returns:
+            需要重新生成的其他页面（"被引用"列表发生变化）
+        """
+        rel_path = md_file.relative_to(self.input_dir)
+        md_content = md_file.read_text(encoding='utf-8')
+        page_title = self.metadata.title(rel_path.with_suffix('').as_posix())
+        headings = extract_text(md_content)[1] if not page_title else []
+        title = self._page_title(rel_path, page_title, headings, self._nav_titles())
+        return self._link_page(rel_path, md_content, title)
+    
+    def _backlinks_html(self, page: str, site_root: str) -> str:
+        """页面的"被以下页面引用"列表，没有其他页面引用时为空"""
+        backlinks = self.link_graph.backlinks(page)
+        if not backlinks:
+            return ""
+        items = '\n'.join(f'<li><a href="{site_root}{source}.html">{escape(title)}</a></li>'
+                          for source, title in backlinks)
+        return f'<section class="backlinks">\n<h2>被以下页面引用</h2>\n<ul>\n{items}\n</ul>\n</section>'
+    
+    def _backlinks_signature(self, page: str) -> str:
+        """"被引用"列表的哈希，记录在构建清单中，列表变化时增量构建会重新生成页面"""
+        return _sha256('\n'.join(f"{source}\t{title}" for source, title
+                                 in self.link_graph.backlinks(page)).encode('utf-8'))
+    
+    def report_broken_links(self, pages: Optional[Iterable[str]] = None) -> List[Tuple[str, int, str]]:
+        """
+        输出目标页面不存在的站内链接（文件:行号），返回 [(页面路径, 行号, 目标), ...]
         
-        # 保存
-        html_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(full_html)
+        Args:
+            pages: 只检查这些页面，默认检查全部页面
+        """
+        broken = self.link_graph.broken_links(pages)
+        for page, line_no, target in broken:
+            print(f"⚠ {self.input_dir / page}.md:{line_no}: 断开的链接 /gpu-glossary/{target}")
+        return broken
+    
+    def write_search_index(self, changed: Optional[Iterable[Path]] = None, removed: Iterable[Path] = ()):
+        """
+        更新并写出搜索索引（开发服务器在文件变化后调用）
         
-        print(f"✓ 生成: {html_file.relative_to(self.output_dir)}")
+        保留了上次构建的索引时，只重新索引 changed 中的源文件并删除 removed 中的页面；
+        没有保留的索引或 changed 为 None 时，重新读取所有源文件
+        """
+        nav_titles = self._nav_titles()
+        if self.search_index is None or changed is None:
+            self.search_index = SearchIndexBuilder()
+            changed = self._iter_sources()
+        for md_file in removed:
+            self.search_index.remove_page(md_file.relative_to(self.input_dir).with_suffix('.html').as_posix())
+        for md_file in changed:
+            if not md_file.exists():
+                continue
+            with open(md_file, 'r', encoding='utf-8') as f:
+                self._index_page(self.search_index, md_file.relative_to(self.input_dir), f.read(), nav_titles)
+        with _timed('search_index'):
+            self.search_index.write(self.output_dir)
     
-    def generate_all(self):
-        """生成所有页面"""
-        md_files = list(self.input_dir.rglob("*.md"))
-        print(f"\n找到 {len(md_files)} 个Markdown文件\n")
+    def _build_fingerprint(self) -> Dict[str, str]:
+        """计算所有页面共享的输入指纹（模板、导航、生成器代码）"""
+        nav_data = json.dumps(self.nav_structure, ensure_ascii=False, sort_keys=True)
+        return {
+            "template": _sha256(f"{self.page_template.template}\n{self.css}\n{SEARCH_JS}".encode('utf-8')),
+            "nav": _sha256(f"{self.base_path}\n{nav_data}".encode('utf-8')),
+            "generator": _sha256(Path(__file__).read_bytes()),
+        }
+    
+    def _load_manifest(self) -> Optional[Dict]:
+        """读取上次构建的清单，不存在或格式不对时返回 None"""
+        manifest_file = self.output_dir / MANIFEST_NAME
+        if not manifest_file.exists():
+            return None
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+    
+    def _save_manifest(self, fingerprint: Dict[str, str], pages: Dict[str, str], backlinks: Dict[str, str]):
+        """保存本次构建的清单（源文件哈希和"被引用"列表的哈希）"""
+        manifest = {"version": MANIFEST_VERSION, **fingerprint, "pages": pages, "backlinks": backlinks}
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    
+    def _remove_stale_pages(self, old_pages: Dict[str, str], current_pages: Dict[str, str]):
+        """删除源文件已不存在的页面"""
+        for rel in sorted(set(old_pages) - set(current_pages)):
+            html_file = self.output_dir / Path(rel).with_suffix('.html')
+            if html_file.exists():
+                html_file.unlink()
+                print(f"✗ 删除: {html_file.relative_to(self.output_dir)}")
+    
+    def _scan_sources(self, search_index: Optional[SearchIndexBuilder] = None) -> Dict[str, str]:
+        """
+        读取所有源文件一次：计算哈希、重新建立交叉引用图，并在提供 search_index 时建立搜索索引
         
-        for md_file in md_files:
+        Returns:
+            {源文件相对路径: 内容哈希}，按遍历顺序排列
+        """
+        nav_titles = self._nav_titles()
+        self.link_graph = LinkGraph()
+        hashes: Dict[str, str] = {}
+        for md_file in self._iter_sources():
             rel_path = md_file.relative_to(self.input_dir)
-            html_file = self.output_dir / rel_path.with_suffix('.html')
+            with _timed('read'):
+                source = md_file.read_bytes()
+            hashes[rel_path.as_posix()] = _sha256(source)
+            md_content = source.decode('utf-8')
             
-            self.generate_page(md_file, html_file)
+            if search_index is not None:
+                title = self._index_page(search_index, rel_path, md_content, nav_titles)
+            else:
+                # 标题优先取元数据索引中的 front matter，没有时才解析正文
+                page_title = self.metadata.title(rel_path.with_suffix('').as_posix())
+                headings = extract_text(md_content)[1] if not page_title else []
+                title = self._page_title(rel_path, page_title, headings, nav_titles)
+            self._link_page(rel_path, md_content, title)
+        return hashes
+    
+    def stale_pages(self) -> Dict[str, str]:
+        """
+        不生成页面，列出下次增量构建需要处理的页面 {源文件相对路径: 原因}
+        
+        原因: new（新页面）、changed（源文件变化）、missing（HTML 不存在）、
+        backlinks（"被引用"列表变化）、rebuild（模板/导航/生成器变化）、removed（源文件已删除）
+        """
+        fingerprint = self._build_fingerprint()
+        manifest = self._load_manifest()
+        if manifest and all(manifest.get(k) == v for k, v in fingerprint.items()):
+            old_pages = manifest.get("pages", {})
+            rebuild = False
+        else:
+            old_pages = manifest.get("pages", {}) if manifest else {}
+            rebuild = True
+        old_backlinks = manifest.get("backlinks", {}) if manifest else {}
+        
+        stale: Dict[str, str] = {}
+        current_pages = self._scan_sources()
+        for rel_key, source_hash in current_pages.items():
+            rel_path = Path(rel_key)
+            if rel_key not in old_pages:
+                stale[rel_key] = "new"
+            elif rebuild:
+                stale[rel_key] = "rebuild"
+            elif old_pages[rel_key] != source_hash:
+                stale[rel_key] = "changed"
+            elif not (self.output_dir / rel_path.with_suffix('.html')).exists():
+                stale[rel_key] = "missing"
+            elif old_backlinks.get(rel_key) != self._backlinks_signature(rel_path.with_suffix('').as_posix()):
+                stale[rel_key] = "backlinks"
+        for rel_key in sorted(set(old_pages) - set(current_pages)):
+            stale[rel_key] = "removed"
+        return stale
+    
+    def _render_pages(self, tasks: Iterable[Tuple[Path, Path]], jobs: int,
+                      max_in_flight: Optional[int] = None) -> Tuple[int, Dict[Path, str]]:
+        """
+        生成页面，返回 (处理的页面数, {md_file: 错误信息})
+        
+        tasks 可以是惰性的迭代器，元素为 (md_file, html_file)，生成时再读取源文件。
+        jobs > 1 时使用进程池并行生成，同时最多有 max_in_flight（默认 jobs * 2）个页面
+        已提交但尚未完成，内存占用不随页面数增长；输出顺序与 tasks 顺序一致。
+        各 worker 的阶段耗时会汇总到 self.timings
+        """
+        errors: Dict[Path, str] = {}
+        count = 0
+        
+        # 只有一个页面时不值得启动进程池
+        tasks = iter(tasks)
+        head = list(itertools.islice(tasks, 2))
+        tasks = itertools.chain(head, tasks)
+        
+        def report(md_file: Path, html_file: Path, error: Optional[str], timings: Dict[str, float]):
+            self._merge_timings(timings)
+            if error:
+                errors[md_file] = error
+                print(f"✗ 失败: {md_file.relative_to(self.input_dir)}")
+            else:
+                print(f"✓ 生成: {html_file.relative_to(self.output_dir)}")
+        
+        if jobs > 1 and len(head) > 1:
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+            window = max(1, max_in_flight or jobs * 2)
+            in_flight = deque()
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(self,)) as executor:
+                # worker 自己读取源文件，只把路径传给子进程
+                for md_file, html_file in tasks:
+                    count += 1
+                    in_flight.append((md_file, html_file,
+                                      executor.submit(_generate_page_in_worker, (md_file, html_file))))
+                    if len(in_flight) >= window:
+                        md_done, html_done, future = in_flight.popleft()
+                        report(md_done, html_done, *future.result())
+                while in_flight:
+                    md_done, html_done, future = in_flight.popleft()
+                    report(md_done, html_done, *future.result())
+        else:
+            for md_file, html_file in tasks:
+                count += 1
+                try:
+                    self.generate_page(md_file, html_file)
+                except Exception:
+                    errors[md_file] = traceback.format_exc()
+                    print(f"✗ 失败: {md_file.relative_to(self.input_dir)}")
+        
+        # 当前进程自己的耗时（顺序生成的页面、搜索索引等）
+        self._merge_timings(take_phase_timings())
+        return count, errors
+    
+    def _merge_timings(self, timings: Dict[str, float]):
+        """合并阶段耗时到 self.timings"""
+        for phase, seconds in timings.items():
+            self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+    
+    def generate_all(self, incremental: bool = False, jobs: int = 1, streaming: bool = False,
+                     max_in_flight: Optional[int] = None):
+        """
+        生成所有页面
+        
+        分两遍处理：第一遍读取所有源文件，计算哈希、建立搜索索引和交叉引用图
+        （"被以下页面引用"列表需要先知道所有页面的出链），并检查断开的链接；
+        第二遍只为需要生成的页面再读取一次源文件。源文件内容不在两遍之间保留，
+        内存占用不随页面数增长，代价是生成的页面各被读取两次
+        
+        Args:
+            incremental: 增量构建，只重新生成输入发生变化的页面
+            jobs: 并行生成页面的进程数，1 表示在当前进程中顺序生成
+            streaming: 搜索索引的倒排记录写入临时文件，适合数万页的词汇表
+            max_in_flight: jobs > 1 时最多同时提交的页面数（默认 jobs * 2）
+        
+        Returns:
+            生成失败的页面 {md_file: 错误信息}
+        """
+        take_phase_timings()
+        self.timings = {}
+        # 上次构建的索引不再使用；也避免把它随生成器一起传给进程池中的 worker
+        self.search_index = None
+        
+        fingerprint = self._build_fingerprint()
+        manifest = self._load_manifest() if incremental else None
         
-        # 创建index.html重定向到readme.html
+        # 模板、导航或生成器代码变化时，所有页面都需要重新生成
+        old_pages: Dict[str, str] = {}
+        if manifest and all(manifest.get(k) == v for k, v in fingerprint.items()):
+            old_pages = manifest.get("pages", {})
+        elif manifest:
+            print("模板/导航已变化，重新生成全部页面\n")
+        
+        old_backlinks: Dict[str, str] = manifest.get("backlinks", {}) if old_pages else {}
+        
+        # 搜索索引直接从源文件构建，增量构建跳过的页面同样会被索引
+        search_index = SpillingSearchIndexBuilder() if streaming else SearchIndexBuilder()
+        current_pages = self._scan_sources(search_index)
+        current_backlinks: Dict[str, str] = {}
+        skipped = 0
+        
+        self.broken_links = self.report_broken_links()
+        
+        def plan() -> Iterator[Tuple[Path, Path]]:
+            nonlocal skipped
+            for rel_key, source_hash in current_pages.items():
+                rel_path = Path(rel_key)
+                html_file = self.output_dir / rel_path.with_suffix('.html')
+                signature = self._backlinks_signature(rel_path.with_suffix('').as_posix())
+                current_backlinks[rel_key] = signature
+                
+                if (old_pages.get(rel_key) == source_hash and old_backlinks.get(rel_key) == signature
+                        and html_file.exists()):
+                    skipped += 1
+                    continue
+                
+                yield self.input_dir / rel_path, html_file
+        
+        self.write_assets()
+        rendered, errors = self._render_pages(plan(), jobs, max_in_flight)
+        
+        with _timed('search_index'):
+            search_index.write(self.output_dir)
+        if not streaming:
+            self.search_index = search_index
+        self._merge_timings(take_phase_timings())
+        
+        # 失败的页面不记录哈希，下次增量构建时会重试
+        for md_file in errors:
+            current_pages[md_file.relative_to(self.input_dir).as_posix()] = ""
+        
+        print(f"\n共 {len(current_pages)} 个Markdown文件")
+        if manifest:
+            self._remove_stale_pages(manifest.get("pages", {}), current_pages)
+            print(f"跳过 {skipped} 个未变化的页面")
+        
+        self._save_manifest(fingerprint, current_pages, current_backlinks)
+        index_html = self._write_index_html()
+        
+        if errors:
+            print(f"\n✗ {len(errors)}/{rendered} 个页面生成失败:")
+            for md_file, error in errors.items():
+                print(f"\n--- {md_file.relative_to(self.input_dir)} ---")
+                print(error.rstrip())
+        
+        _print_phase_timings(self.timings)
+        
+        print(f"\n✓ 完成! 网站已生成到: {self.output_dir}")
+        print(f"  生成 {rendered - len(errors)} 个页面，失败 {len(errors)} 个")
+        if self.broken_links:
+            print(f"  ⚠ {len(self.broken_links)} 个断开的站内链接（见上方）")
+        print(f"  打开 {index_html} 查看")
+        return errors
+    
+    def _write_index_html(self) -> Path:
+        """创建index.html重定向到readme.html"""
         index_html = self.output_dir / "index.html"
         with open(index_html, 'w', encoding='utf-8') as f:
             f.write("""<!DOCTYPE html>
@@ -566,13 +1223,32 @@ class WebsiteGenerator:
     <p>跳转中... <a href="readme.html">点击这里</a></p>
 </body>
 </html>""")
-        
-        print(f"\n✓ 完成! 网站已生成到: {self.output_dir}")
-        print(f"  打开 {index_html} 查看")
+        return index_html
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="生成 GPU Glossary 中文版静态网站")
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量构建：只重新生成内容、模板或导航发生变化的页面")
+    parser.add_argument("--template-dir", type=Path,
+                        help="自定义模板目录（page.html / style.css）")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="并行生成页面的进程数（0 表示使用全部 CPU 核心，默认 1）")
+    parser.add_argument("--precompress", action="store_true",
+                        help="构建完成后为 HTML/CSS/JS 写出 .gz 和 .br 预压缩文件")
+    parser.add_argument("--precompress-jobs", type=int, default=0,
+                        help="预压缩的并行线程数（默认 0，使用全部 CPU 核心）")
+    parser.add_argument("--base-path", default=None,
+                        help="站点的 base path（默认读取 GITHUB_PAGES_BASE 环境变量，否则为 /gpu-glossary-zh/）")
+    parser.add_argument("--streaming", action="store_true",
+                        help="低内存模式：搜索索引的倒排记录写入临时文件（适合数万页的词汇表）")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="并行生成时最多同时提交的页面数（默认 jobs * 2）")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="存在断开的站内链接时以非零状态码退出（默认只输出警告）")
+    args = parser.parse_args(argv)
+    
     print("=" * 60)
     print("GPU Glossary 网站生成器")
     print("=" * 60)
@@ -588,11 +1264,42 @@ def main():
     
     # 从环境变量读取 base_path，用于 GitHub Pages 部署
     # 本地开发时设置为空字符串，GitHub Actions 时设置为仓库名
-    base_path = os.getenv('GITHUB_PAGES_BASE', '/gpu-glossary-zh/')
+    base_path = args.base_path if args.base_path is not None else os.getenv('GITHUB_PAGES_BASE', '/gpu-glossary-zh/')
     print(f"Base path: {base_path}")
     
-    generator = WebsiteGenerator(input_dir, output_dir, base_path)
-    generator.generate_all()
+    generator = WebsiteGenerator(input_dir, output_dir, base_path, template_dir=args.template_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    errors = generator.generate_all(incremental=args.incremental, jobs=jobs, streaming=args.streaming,
+                                    max_in_flight=args.max_in_flight)
+    
+    if args.precompress:
+        from precompress import precompress_directory
+        stats = precompress_directory(output_dir, jobs=args.precompress_jobs)
+        print(f"\n✓ 预压缩: 写出 {stats['written']} 个，未变化 {stats['skipped']} 个，"
+              f"删除 {stats['removed']} 个过期文件")
+    
+    if errors or (args.strict_links and generator.broken_links):
+        sys.exit(1)
+
+
+
+def stale_main(argv: Optional[List[str]] = None):
+    """列出过期页面：只读取源文件和构建清单，不导入 markdown"""
+    parser = argparse.ArgumentParser(description="列出下次增量构建需要重新生成的页面")
+    parser.add_argument("--input", type=Path, default=Path(__file__).parent / "translated",
+                        help="Markdown 目录（默认 translated/）")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "website",
+                        help="网站目录（默认 website/）")
+    parser.add_argument("--base-path", default=None,
+                        help="与构建时相同的 base path（默认读取 GITHUB_PAGES_BASE 环境变量）")
+    args = parser.parse_args(argv)
+    
+    base_path = args.base_path if args.base_path is not None else os.getenv('GITHUB_PAGES_BASE', '/gpu-glossary-zh/')
+    generator = WebsiteGenerator(args.input, args.output, base_path)
+    stale = generator.stale_pages()
+    for rel_path, reason in stale.items():
+        print(f"{reason:<8} {rel_path}")
+    print(f"共 {len(stale)} 个页面需要处理")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+GPU Glossary 统一命令行入口
+
+    python glossary.py download   [参数...]   # 下载原始 Markdown（download_and_translate.py）
+    python glossary.py translate  [参数...]   # AI 翻译（translate_with_ai.py）
+    python glossary.py build      [参数...]   # 生成网站（generate_website.py）
+    python glossary.py preview                # 用英文原文生成预览版（generate_preview.py）
+    python glossary.py serve      [参数...]   # 本地预览服务器（dev_server.py）
+    python glossary.py stale                  # 列出下次增量构建需要重新生成的页面
+    python glossary.py terms      [参数...]   # 检查译文的术语一致性（terminology.py）
+
+每个子命令只在运行时导入自己的模块，requests、markdown、Pygments 等依赖不会拖慢其他命令的启动。
+子命令的参数原样转发给对应脚本，例如 `python glossary.py build --help`
+"""
+
+import argparse
+import importlib
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+# 子命令 -> (模块, 入口函数, 说明)
+COMMANDS = {
+    "download": ("download_and_translate", "main", "从 GitHub 下载原始 Markdown 文件"),
+    "translate": ("translate_with_ai", "main", "使用 AI 翻译 content/ 到 translated/"),
+    "build": ("generate_website", "main", "生成静态网站"),
+    "preview": ("generate_preview", "main", "使用英文原文生成预览版网站"),
+    "serve": ("dev_server", "main", "本地预览生成的网站"),
+    "stale": ("generate_website", "stale_main", "列出下次增量构建需要重新生成的页面"),
+    "terms": ("terminology", "main", "检查译文的术语一致性"),
+}
+
+
+def profile_imports(module: str, top: int = 15):
+    """
+    用 python -X importtime 在子进程中测量导入 module 的耗时，按累计耗时列出最慢的模块
+
+    在独立进程中测量，结果不受当前进程已导入模块的影响
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(Path(__file__).parent), capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if parts[0].isdigit():
+            rows.append((int(parts[1]), int(parts[0]), parts[2]))
+
+    total = next((cumulative for cumulative, _, name in rows if name == module), 0)
+    print(f"导入 {module}: {total / 1000:.1f} ms，共 {len(rows)} 个模块", file=sys.stderr)
+    print(f"  {'累计(ms)':>9} {'自身(ms)':>9}  模块", file=sys.stderr)
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:9.1f} {self_us / 1000:9.1f}  {name}", file=sys.stderr)
+    print(file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(
+        description="GPU Glossary 命令行工具",
+        epilog="子命令: " + "; ".join(f"{name} - {info[2]}" for name, info in COMMANDS.items()),
+    )
+    parser.add_argument("--profile-imports", action="store_true",
+                        help="运行前输出子命令模块的导入耗时（python -X importtime）")
+    parser.add_argument("--time", action="store_true", help="结束时输出总耗时")
+    parser.add_argument("command", choices=sorted(COMMANDS), help="子命令")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="转发给子命令的参数")
+    args = parser.parse_args(argv)
+
+    module_name, func_name, _ = COMMANDS[args.command]
+    if args.profile_imports:
+        profile_imports(module_name)
+
+    func = getattr(importlib.import_module(module_name), func_name)
+
+    try:
+        if args.command == "preview":
+            if args.args:
+                parser.error("preview 不接受参数")
+            func()
+        else:
+            func(args.args)
+    finally:
+        if args.time:
+            print(f"\n用时 {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
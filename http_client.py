@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+共享的 HTTP 客户端：连接池、超时、传输层重试，以及连接复用和延迟统计
+翻译（AITranslator）和下载（GitHubDownloader）都通过它发出请求
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+class _CountingAdapter(HTTPAdapter):
+    """统计新建连接数的适配器"""
+
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_new_connection = self._on_new_connection
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):
+                on_new_connection()
+                return super()._new_conn()
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                on_new_connection()
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    """
+    线程安全的 HTTP 客户端
+
+    所有线程共享一个 Session 和连接池。传输层只重试建立连接失败的请求（请求尚未发出，
+    POST 重试也是安全的）；429/5xx 的退避由调用方处理，因为它们需要读取 Retry-After
+    等响应头并在线程之间共享暂停状态
+    """
+
+    def __init__(self, pool_size: int = 8, timeout: Union[float, Tuple[float, float]] = (10, 60),
+                 connect_retries: int = 3, backoff_factor: float = 0.5,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            pool_size: 每个主机保持的最大连接数，应不小于并发线程数
+            timeout: 默认超时（秒），可以是 (连接超时, 读取超时)
+            connect_retries: 建立连接失败时的重试次数
+            backoff_factor: 连接重试的指数退避系数
+            headers: 所有请求共用的请求头
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+        retry = Retry(total=connect_retries, connect=connect_retries, read=0, status=0, other=0,
+                      backoff_factor=backoff_factor, allowed_methods=None, raise_on_status=False)
+        adapter = _CountingAdapter(self._count_new_connection, pool_connections=4,
+                                   pool_maxsize=max(1, pool_size), max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # 统计信息（所有线程共享）
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _count_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求，未指定 timeout 时使用默认超时
+
+        延迟统计到收到响应头为止（stream=True 时不包含读取响应体的时间）
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.monotonic()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            latency = time.monotonic() - start
+            with self._lock:
+                self.requests += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, float]:
+        """请求数、新建和复用的连接数、错误数和延迟"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(0, self.requests - self.errors - self.new_connections),
+                "errors": self.errors,
+                "avg_latency": self.total_latency / self.requests if self.requests else 0.0,
+                "max_latency": self.max_latency,
+            }
+
+    def summary(self) -> str:
+        """一行统计摘要"""
+        stats = self.stats()
+        return (f"HTTP: {stats['requests']} 个请求，新建连接 {stats['new_connections']} 个，"
+                f"复用 {stats['reused_connections']} 次，错误 {stats['errors']} 个，"
+                f"平均延迟 {stats['avg_latency'] * 1000:.0f} ms，最大 {stats['max_latency'] * 1000:.0f} ms")
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+页面之间的交叉引用图
+从 Markdown 源文件中提取站内链接（/gpu-glossary/...），记录每个页面的出链和入链，
+用于检查断开的链接和生成"被以下页面引用"列表
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Markdown 行内链接 [文字](/gpu-glossary/...) 和原始 HTML 中的 href="/gpu-glossary/..."，
+# 与 generate_website 中 glossary-link 改写规则处理的链接相同
+_LINK_RE = re.compile(r'\]\(\s*<?/gpu-glossary/([^\s)>#?]+)|href="/gpu-glossary/([^"#?]+)"')
+_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_INLINE_CODE_RE = re.compile(r'(`+).*?\1')
+
+
+def extract_links(md_content: str) -> List[Tuple[str, int]]:
+    """
+    提取站内链接，返回 [(目标页面路径，不含扩展名, 行号), ...]
+
+    跳过围栏代码块和行内代码中的链接（它们不会被渲染成链接）
+    """
+    links = []
+    fence = None
+    for line_no, line in enumerate(md_content.splitlines(), 1):
+        fence_match = _FENCE_RE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+            continue
+        if fence is not None or '/gpu-glossary/' not in line:
+            continue
+        if '`' in line:
+            line = _INLINE_CODE_RE.sub('', line)
+        for match in _LINK_RE.finditer(line):
+            links.append((match.group(1) or match.group(2), line_no))
+    return links
+
+
+class LinkGraph:
+    """
+    页面 -> 出链 / 入链
+
+    页面路径不含扩展名，例如 perf/occupancy。每个源文件调用一次 set_page，
+    不需要为单个页面重新扫描其他页面
+    """
+
+    def __init__(self):
+        self.outgoing: Dict[str, List[Tuple[str, int]]] = {}  # 页面 -> [(目标, 行号)]
+        self.incoming: Dict[str, Set[str]] = {}  # 目标 -> 引用它的页面
+        self.titles: Dict[str, str] = {}
+
+    def set_page(self, page: str, title: str, links: List[Tuple[str, int]]) -> Set[str]:
+        """
+        设置页面的标题和出链，返回"被引用"列表因此变化的页面
+
+        页面引用自己的链接不计入入链
+        """
+        old_targets = {target for target, _ in self.outgoing.get(page, ())} - {page}
+        new_targets = {target for target, _ in links} - {page}
+        title_changed = self.titles.get(page, title) != title
+
+        self.outgoing[page] = links
+        self.titles[page] = title
+        for target in old_targets - new_targets:
+            self.incoming[target].discard(page)
+        for target in new_targets - old_targets:
+            self.incoming.setdefault(target, set()).add(page)
+
+        # 标题变化时，所有被它引用的页面上显示的标题都要更新
+        return (old_targets | new_targets) if title_changed else (old_targets ^ new_targets)
+
+    def remove_page(self, page: str) -> Set[str]:
+        """删除页面，返回"被引用"列表因此变化的页面"""
+        targets = {target for target, _ in self.outgoing.pop(page, ())} - {page}
+        self.titles.pop(page, None)
+        for target in targets:
+            self.incoming[target].discard(page)
+        return targets
+
+    def backlinks(self, page: str) -> List[Tuple[str, str]]:
+        """引用 page 的页面 [(页面路径, 标题), ...]，按路径排序"""
+        return [(source, self.titles[source]) for source in sorted(self.incoming.get(page, ()))]
+
+    def broken_links(self, pages: Optional[Iterable[str]] = None) -> List[Tuple[str, int, str]]:
+        """
+        目标页面不存在的链接 [(页面路径, 行号, 目标), ...]
+
+        Args:
+            pages: 只检查这些页面的出链，默认检查所有页面
+        """
+        broken = []
+        for page in sorted(self.outgoing if pages is None else pages):
+            for target, line_no in self.outgoing.get(page, ()):
+                if target not in self.outgoing:
+                    broken.append((page, line_no, target))
+        return broken
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+把 Markdown 文档切分为顶层块（段落、标题、列表、表格、代码块等），
+并把块分组为适合单次请求的分段
+翻译记忆和分块翻译都以这里切出的块为基本单位
+"""
+
+import re
+from typing import List
+
+
+_FENCE_RE = re.compile(r'^\s*(`{3,}|~{3,})')
+_HEADING_RE = re.compile(r'^#{1,6}\s')
+
+
+def split_blocks(content: str) -> List[str]:
+    """
+    按空行切分顶层块
+
+    围栏代码块（``` / ~~~）和 <pre> 块内部的空行不会切开。
+    块之间的空行不保留，用 join_blocks 重新拼接
+    """
+    blocks: List[str] = []
+    current: List[str] = []
+    fence = None  # 当前所在代码块的围栏，例如 "```"
+    in_pre = False
+
+    for line in content.split('\n'):
+        if fence:
+            current.append(line)
+            if line.strip().startswith(fence) and not line.strip().strip(fence[0]):
+                fence = None
+            continue
+
+        if in_pre:
+            current.append(line)
+            if '</pre>' in line:
+                in_pre = False
+            continue
+
+        match = _FENCE_RE.match(line)
+        if match:
+            fence = match.group(1)
+            current.append(line)
+            continue
+
+        if '<pre' in line and '</pre>' not in line:
+            in_pre = True
+            current.append(line)
+            continue
+
+        if not line.strip():
+            if current:
+                blocks.append('\n'.join(current))
+                current = []
+            continue
+
+        current.append(line)
+
+    if current:
+        blocks.append('\n'.join(current))
+    return blocks
+
+
+def join_blocks(blocks: List[str]) -> str:
+    """用空行拼接块"""
+    return '\n\n'.join(blocks) + '\n'
+
+
+def is_verbatim(block: str) -> bool:
+    """整块都是代码（围栏代码块或 <pre>），不需要翻译"""
+    stripped = block.strip()
+    if _FENCE_RE.match(stripped):
+        fence = _FENCE_RE.match(stripped).group(1)
+        return stripped.endswith(fence[0] * len(fence)) and stripped.count('\n') > 0
+    return stripped.startswith('<pre') and stripped.endswith('</pre>')
+
+
+def chunk_blocks(blocks: List[str], max_chars: int) -> List[List[int]]:
+    """
+    把连续的块分组，每组总长度不超过 max_chars，返回每组的块下标
+
+    只在块边界切分，因此不会切开代码块、表格或链接；单个块超过上限时独占一组。
+    当前组已超过一半容量时，遇到标题会提前开始新组，让每组尽量是完整的小节
+    """
+    groups: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+
+    for index, block in enumerate(blocks):
+        length = len(block) + 2
+        starts_section = bool(_HEADING_RE.match(block)) and size >= max_chars // 2
+        if current and (size + length > max_chars or starts_section):
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(index)
+        size += length
+
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+页面元数据索引：只读取每个 Markdown 文件开头的 front matter，不读取正文
+结果按文件的 (mtime, 大小) 缓存到 JSON 文件中，未变化的文件不会重新打开。
+网站生成器用它生成导航，搜索标题、增量构建和过期页面检查也可以直接复用
+
+导航相关的 front matter 字段:
+
+    title: 什么是线程束？        # 页面标题
+    nav_title: 线程束 (Warp)     # 导航中显示的标题（默认使用 title）
+    nav_order: 6                 # 同一层中的顺序（没有的排在最后，再按路径排序）
+    nav_exclude: true            # 不出现在导航中
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+NAV_KEYS = ("nav_title", "nav_order", "nav_exclude")
+
+# front matter 之前最多读取的行数（翻译脚本在开头写入的 HTML 注释也算在内）
+MAX_HEADER_LINES = 64
+
+CACHE_VERSION = 1
+
+_FRONT_MATTER_BLOCK_RE = re.compile(r'\A(\s*---[ \t]*\n)(.*?)(^---[ \t]*$)', re.DOTALL | re.MULTILINE)
+_FRONT_MATTER_RE = re.compile(r'\A\s*---[ \t]*\n(.*?)^---[ \t]*(?:\n|\Z)', re.DOTALL | re.MULTILINE)
+
+
+def iter_markdown_files(directory: Path) -> Iterator[os.DirEntry]:
+    """惰性遍历目录中的 Markdown 文件，每层目录按名称排序（与 sorted(rglob("*.md")) 顺序相同）"""
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir():
+            yield from iter_markdown_files(Path(entry.path))
+        elif entry.name.endswith('.md') and entry.is_file():
+            yield entry
+
+
+def _parse_line(line: str, meta: Dict[str, str]):
+    """解析一行 key: value，值两端的引号会被去掉"""
+    key, sep, value = line.strip().partition(':')
+    if sep and key and not key.startswith('#'):
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        meta[key.strip()] = value
+
+
+def split_front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """把 Markdown 文本拆分为 (front matter 字段, 正文)；调用前需要先去掉开头的 HTML 注释"""
+    match = _FRONT_MATTER_RE.match(text)
+    if not match:
+        return {}, text
+    meta: Dict[str, str] = {}
+    for line in match.group(1).splitlines():
+        _parse_line(line, meta)
+    return meta, text[match.end():]
+
+
+def front_matter_length(text: str) -> Optional[int]:
+    """
+    文本开头 front matter（含结束行和换行）的长度，没有 front matter 时为 0
+
+    text 只是流式输出的开头、还无法判断时返回 None
+    """
+    stripped = text.lstrip()
+    if stripped[:3] != '---'[:len(stripped)]:
+        return 0
+    first, newline, _ = stripped.partition('\n')
+    if not newline:
+        return None
+    if first.rstrip(' \t') != '---':
+        return 0
+    match = _FRONT_MATTER_RE.match(text)
+    if match and match.group(0).endswith('\n'):
+        return match.end()
+    return None
+
+
+def read_front_matter(path: Path) -> Dict[str, str]:
+    """
+    读取文件开头 --- 之间的 key: value 行，读到结束标记为止
+
+    跳过开头的空行和 HTML 注释（翻译脚本写入的元信息）。没有 front matter、
+    或在 MAX_HEADER_LINES 行内没有结束时返回空字典。只支持单行的值
+    """
+    meta: Dict[str, str] = {}
+    in_comment = False
+    in_block = False
+    with open(path, 'r', encoding='utf-8') as f:
+        for _ in range(MAX_HEADER_LINES):
+            line = f.readline()
+            if not line:
+                break
+            stripped = line.strip()
+            if in_block:
+                if stripped == '---':
+                    return meta
+                _parse_line(stripped, meta)
+            elif in_comment:
+                in_comment = '-->' not in stripped
+            elif stripped.startswith('<!--'):
+                in_comment = '-->' not in stripped
+            elif stripped == '---':
+                in_block = True
+            elif stripped:
+                break
+    return {}
+
+
+def set_front_matter(text: str, values: Dict[str, str]) -> str:
+    """在 Markdown 文本的 front matter 中设置字段（替换同名字段），没有 front matter 时新建一个"""
+    lines = [f"{key}: {value}" for key, value in values.items()]
+    match = _FRONT_MATTER_BLOCK_RE.match(text)
+    if not match:
+        return "---\n" + "\n".join(lines) + "\n---\n\n" + text
+    kept = [line for line in match.group(2).splitlines()
+            if line.partition(':')[0].strip() not in values]
+    return text[:match.end(1)] + "\n".join(kept + lines) + "\n" + text[match.start(3):]
+
+
+def nav_metadata(previous: Path) -> Dict[str, str]:
+    """已有译文 previous 中的导航字段（nav_*），文件不存在时为空"""
+    if not previous.exists():
+        return {}
+    return {key: value for key, value in read_front_matter(previous).items() if key in NAV_KEYS}
+
+
+def carry_nav_metadata(previous: Path, text: str) -> str:
+    """
+    把已有译文 previous 中的导航字段（nav_*）写入新的译文 text
+
+    导航顺序只记录在译文中，重新翻译时用它保留
+    """
+    values = nav_metadata(previous)
+    return set_front_matter(text, values) if values else text
+
+
+def _is_true(value: Optional[str]) -> bool:
+    return (value or "").lower() in ("true", "yes", "1")
+
+
+class PageMetadataIndex:
+    """
+    {页面路径（不含扩展名）: front matter}
+
+    refresh() 遍历目录，只重新读取 (mtime, 大小) 变化的文件，并把结果写回缓存文件
+    """
+
+    def __init__(self, input_dir: Path, cache_path: Optional[Path] = None):
+        self.input_dir = input_dir
+        self.cache_path = cache_path
+        self.pages: Dict[str, Dict[str, str]] = {}
+        self._entries: Dict[str, dict] = {}  # 源文件相对路径 -> {"mtime_ns", "size", "meta"}
+        if cache_path is not None and cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    cache = json.load(f)
+                if cache.get("version") == CACHE_VERSION:
+                    self._entries = cache.get("files", {})
+            except (OSError, ValueError):
+                pass
+
+    def refresh(self) -> int:
+        """更新索引，返回重新读取的文件数"""
+        entries: Dict[str, dict] = {}
+        reread = 0
+        if self.input_dir.is_dir():
+            for entry in iter_markdown_files(self.input_dir):
+                rel_key = Path(entry.path).relative_to(self.input_dir).as_posix()
+                stat = entry.stat()
+                cached = self._entries.get(rel_key)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    entries[rel_key] = cached
+                    continue
+                entries[rel_key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                                    "meta": read_front_matter(Path(entry.path))}
+                reread += 1
+
+        changed = reread or entries.keys() != self._entries.keys()
+        self._entries = entries
+        self.pages = {rel_key[:-len('.md')]: entry["meta"] for rel_key, entry in entries.items()}
+        if changed:
+            self._save()
+        return reread
+
+    def _save(self):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "files": self._entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.cache_path)
+
+    def get(self, page: str) -> Dict[str, str]:
+        """页面的 front matter，页面不存在时为空字典"""
+        return self.pages.get(page, {})
+
+    def title(self, page: str) -> Optional[str]:
+        return self.get(page).get("title")
+
+    def nav_title(self, page: str) -> str:
+        meta = self.get(page)
+        return meta.get("nav_title") or meta.get("title") or page.rsplit('/', 1)[-1]
+
+    def _sort_key(self, page: str):
+        try:
+            order = float(self.get(page).get("nav_order", ""))
+        except ValueError:
+            order = float("inf")
+        return order, page
+
+    def build_nav(self) -> List[Dict]:
+        """
+        生成导航结构 [{"title", "path", "children": [{"title", "path"}, ...]}, ...]
+
+        顶层的 xxx.md 是一个导航项，xxx/ 目录（包括更深的子目录）中的页面是它的子项；
+        没有对应顶层页面的目录中的页面直接放在顶层
+        """
+        top: List[str] = []
+        children: Dict[str, List[str]] = {}
+        for page, meta in self.pages.items():
+            if _is_true(meta.get("nav_exclude")):
+                continue
+            section = page.split('/', 1)[0]
+            if section == page:
+                top.append(page)
+            else:
+                children.setdefault(section, []).append(page)
+
+        for section in list(children):
+            if section not in top:
+                top.extend(children.pop(section))
+
+        return [
+            {
+                "title": self.nav_title(page),
+                "path": page,
+                "children": [{"title": self.nav_title(child), "path": child}
+                             for child in sorted(children.get(page, []), key=self._sort_key)],
+            }
+            for page in sorted(top, key=self._sort_key)
+        ]
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+为生成的网站写出预压缩文件（.gz / .br）
+静态服务器可以直接发送预压缩文件，省去每次请求时的压缩开销
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+# 需要预压缩的文件类型
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.json', '.svg', '.txt', '.xml'}
+
+# 小于该大小的文件压缩收益很小，跳过
+MIN_SIZE = 256
+
+# 记录每个源文件上次压缩时的内容哈希（以 . 开头，自身不会被压缩）
+MANIFEST_NAME = ".precompress-manifest.json"
+
+# 本工具写出的压缩文件后缀
+ALL_SUFFIXES = ['.gz', '.br']
+
+
+def _gzip_compress(data: bytes) -> bytes:
+    # mtime=0 保证相同输入得到相同输出
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _load_compressors(formats: List[str]) -> Dict[str, Callable[[bytes], bytes]]:
+    """按格式名加载压缩函数，brotli 为可选依赖"""
+    compressors: Dict[str, Callable[[bytes], bytes]] = {}
+    for fmt in formats:
+        if fmt == 'gz':
+            compressors['.gz'] = _gzip_compress
+        elif fmt == 'br':
+            try:
+                import brotli
+            except ImportError:
+                print("⚠️  未安装 brotli，跳过 .br 文件（pip install brotli）")
+                continue
+            compressors['.br'] = lambda data: brotli.compress(data, quality=11)
+        else:
+            raise ValueError(f"不支持的压缩格式: {fmt}")
+    return compressors
+
+
+def _is_up_to_date(source: Path, target: Path) -> bool:
+    """压缩文件的 mtime 与源文件一致时认为没有变化"""
+    try:
+        return target.stat().st_mtime_ns == source.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _compress_file(source: Path, compressors: Dict[str, Callable[[bytes], bytes]],
+                   known_hash: Optional[str] = None) -> Tuple[int, int, Optional[str]]:
+    """
+    压缩单个文件，返回 (写出的文件数, 跳过的文件数, 源文件内容哈希)
+
+    mtime 不同但内容哈希与上次压缩时相同（例如完整构建重新写出了相同的页面）时，
+    只把压缩文件的 mtime 更新为源文件的 mtime，不重新压缩
+    """
+    written = skipped = 0
+    data = None
+    content_hash = known_hash
+    stat = source.stat()
+
+    for suffix, compress in compressors.items():
+        target = source.with_name(source.name + suffix)
+        if _is_up_to_date(source, target):
+            skipped += 1
+            continue
+
+        if data is None:
+            data = source.read_bytes()
+            content_hash = hashlib.sha256(data).hexdigest()
+        if content_hash == known_hash and target.exists():
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            skipped += 1
+            continue
+        compressed = compress(data)
+
+        # 先写临时文件再替换，避免服务器读到写了一半的文件
+        tmp = target.with_name(target.name + '.tmp')
+        tmp.write_bytes(compressed)
+        os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp, target)
+        written += 1
+
+    return written, skipped, content_hash
+
+
+def _load_manifest(root: Path) -> Dict[str, str]:
+    try:
+        with open(root / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _remove_orphans(root: Path, sources: Set[Path], enabled: Set[str]) -> int:
+    """
+    删除过期的压缩文件和中断时遗留的临时文件
+
+    源文件已删除、小于 MIN_SIZE 或对应格式没有启用时，压缩文件都不会再被更新，
+    留着会让 gzip_static / brotli_static 继续发送旧内容
+    """
+    removed = 0
+    for suffix in ALL_SUFFIXES:
+        for target in root.rglob(f"*{suffix}.tmp"):
+            target.unlink()
+            removed += 1
+        for target in root.rglob(f"*{suffix}"):
+            source = target.with_name(target.name[:-len(suffix)])
+            if source.suffix not in COMPRESSIBLE_SUFFIXES:
+                # 不是本工具写出的文件（例如 .tar.gz 下载包）
+                continue
+            if suffix not in enabled or source not in sources:
+                target.unlink()
+                removed += 1
+    return removed
+
+
+def precompress_directory(root: Path, formats: List[str] = ('gz', 'br'), jobs: int = 0) -> Dict[str, int]:
+    """
+    为目录下所有可压缩文件写出预压缩版本
+
+    Args:
+        root: 网站输出目录
+        formats: 压缩格式，可选 'gz' 和 'br'
+        jobs: 并行线程数，0 表示使用 CPU 核心数（zlib/brotli 压缩时会释放 GIL）
+
+    Returns:
+        统计信息 {'written': ..., 'skipped': ..., 'removed': ...}
+    """
+    compressors = _load_compressors(list(formats))
+
+    sources = sorted(
+        path for path in root.rglob("*")
+        if path.is_file()
+        and path.suffix in COMPRESSIBLE_SUFFIXES
+        and not path.name.startswith('.')
+        and path.stat().st_size >= MIN_SIZE
+    )
+
+    stats = {'written': 0, 'skipped': 0, 'removed': _remove_orphans(root, set(sources), set(compressors))}
+    if not compressors:
+        return stats
+
+    old_hashes = _load_manifest(root)
+    hashes: Dict[str, str] = {}
+    workers = jobs if jobs > 0 else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        keys = [path.relative_to(root).as_posix() for path in sources]
+        results = executor.map(lambda item: _compress_file(item[0], compressors, old_hashes.get(item[1])),
+                               zip(sources, keys))
+        for key, (written, skipped, content_hash) in zip(keys, results):
+            stats['written'] += written
+            stats['skipped'] += skipped
+            if content_hash:
+                hashes[key] = content_hash
+
+    tmp = root / (MANIFEST_NAME + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, sort_keys=True)
+    os.replace(tmp, root / MANIFEST_NAME)
+    return stats
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="为生成的网站写出 .gz / .br 预压缩文件")
+    parser.add_argument("root", type=Path, nargs="?", default=Path(__file__).parent / "website",
+                        help="网站目录（默认 website/）")
+    parser.add_argument("--formats", default="gz,br", help="压缩格式，逗号分隔（默认 gz,br）")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="并行线程数（默认 CPU 核心数）")
+    args = parser.parse_args()
+
+    if not args.root.exists():
+        print(f"错误: 目录不存在: {args.root}")
+        return
+
+    stats = precompress_directory(args.root, args.formats.split(','), args.jobs)
+    print(f"✓ 预压缩完成: 写出 {stats['written']} 个，未变化 {stats['skipped']} 个，"
+          f"删除 {stats['removed']} 个过期文件")
+
+
+if __name__ == "__main__":
+    main()
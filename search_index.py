@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+生成站内搜索用的倒排索引
+中文按字符二元组（bigram）切分，英文按单词切分；索引按词的哈希分片，
+浏览器只下载查询词所在的分片
+"""
+
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from page_metadata import split_front_matter
+
+
+# 标题、小标题、正文中出现的词分别计分
+TITLE_WEIGHT = 10
+HEADING_WEIGHT = 3
+BODY_WEIGHT = 1
+# 正文中反复出现的词最多计这么多分，避免长页面压过标题匹配
+MAX_BODY_SCORE = 5
+
+# 每个分片大约包含的词条数
+TOKENS_PER_SHARD = 2000
+MAX_SHARDS = 256
+
+# SpillingSearchIndexBuilder 在内存中缓冲的倒排记录条数，超过后追加写入临时文件
+SPILL_LINES = 100000
+
+SEARCH_DIR = "search"
+
+_TOKEN_RE = re.compile(r'[a-z0-9_]+|[\u3400-\u9fff\uf900-\ufaff]+')
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_HEADING_RE = re.compile(r'^#{1,6}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+_IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """
+    切分搜索词：英文单词（至少 2 个字符）和中文字符二元组
+
+    单独出现的一个汉字按单字索引。浏览器端 search.js 使用相同的规则切分查询
+    """
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group(0)
+        if run[0] < '\u3400':
+            if len(run) >= 2:
+                yield run
+        elif len(run) == 1:
+            yield run
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2]
+
+
+def shard_of(token: str, shard_count: int) -> int:
+    """词所在的分片（32 位 FNV-1a，按 Unicode 码点计算，与 search.js 保持一致）"""
+    h = 0x811c9dc5
+    for ch in token:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xffffffff
+    return h % shard_count
+
+
+def extract_text(md_content: str) -> Tuple[Optional[str], List[str], str]:
+    """
+    从 Markdown 中提取 (front matter 标题, 小标题列表, 正文纯文本)
+    """
+    meta, md_content = split_front_matter(_COMMENT_RE.sub('', md_content))
+    title = meta.get('title')
+    headings = _HEADING_RE.findall(md_content)
+
+    body = _IMAGE_RE.sub(' ', md_content)
+    body = _LINK_RE.sub(r'\1', body)
+    body = _TAG_RE.sub(' ', body)
+    return title, headings, body
+
+
+class SearchIndexBuilder:
+    """
+    收集页面并写出分片的倒排索引
+
+    可以在写出后继续替换或删除单个页面再次写出（开发服务器只重新索引变化的页面）。
+    替换的页面保留原来的文档编号，新页面排在最后
+    """
+
+    def __init__(self):
+        self.docs: List[Optional[Tuple[str, str]]] = []  # (页面 URL，相对站点根目录, 标题)，已删除为 None
+        self.postings: Dict[str, Dict[int, int]] = {}  # 词 -> {文档编号: 分数}
+        self._doc_ids: Dict[str, int] = {}  # 页面 URL -> 文档编号
+
+    def add_page(self, url: str, title: str, headings: List[str], body: str):
+        """添加一个页面，URL 已存在时替换原来的内容"""
+        doc_id = self._doc_ids.get(url)
+        if doc_id is None:
+            doc_id = self._doc_ids[url] = len(self.docs)
+            self.docs.append(None)
+        else:
+            self._drop_postings(doc_id)
+        self.docs[doc_id] = (url, title)
+        for token, score in self._page_scores(title, headings, body).items():
+            self.postings.setdefault(token, {})[doc_id] = score
+
+    def remove_page(self, url: str):
+        """删除一个页面，URL 不存在时忽略"""
+        doc_id = self._doc_ids.pop(url, None)
+        if doc_id is not None:
+            self._drop_postings(doc_id)
+            self.docs[doc_id] = None
+
+    def _drop_postings(self, doc_id: int):
+        # 不为每个页面另存词表（那会让整次构建的内存翻倍），替换时遍历一遍词典
+        for token in [token for token, doc_scores in self.postings.items() if doc_id in doc_scores]:
+            doc_scores = self.postings[token]
+            del doc_scores[doc_id]
+            if not doc_scores:
+                del self.postings[token]
+
+    @staticmethod
+    def _page_scores(title: str, headings: List[str], body: str) -> Dict[str, int]:
+        """一个页面中每个词的分数"""
+        page_scores: Dict[str, int] = {}
+        for text, weight, limit in ((title, TITLE_WEIGHT, None),
+                                    (' '.join(headings), HEADING_WEIGHT, None),
+                                    (body, BODY_WEIGHT, MAX_BODY_SCORE)):
+            counts: Dict[str, int] = {}
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                score = count * weight
+                page_scores[token] = page_scores.get(token, 0) + (min(score, limit) if limit else score)
+        return page_scores
+
+    def write(self, output_dir: Path) -> int:
+        """
+        写出 search/docs.json 和 search/shard-<n>.json，返回分片数
+
+        docs.json: {"shards": 分片数, "docs": [[url, 标题], ...]}
+        shard-<n>.json: {词: [文档编号, 分数, 文档编号, 分数, ...]}
+        """
+        # 删除过页面时重新编号，文档列表中不留空位
+        live = [doc_id for doc_id, doc in enumerate(self.docs) if doc is not None]
+        renumber = None if len(live) == len(self.docs) else {doc_id: new for new, doc_id in enumerate(live)}
+
+        shard_count = _shard_count(len(self.postings))
+        shards: List[Dict[str, List[int]]] = [{} for _ in range(shard_count)]
+        for token in sorted(self.postings):
+            doc_scores = self.postings[token].items()
+            if renumber is not None:
+                doc_scores = [(renumber[doc_id], score) for doc_id, score in doc_scores]
+            shards[shard_of(token, shard_count)][token] = _flatten(doc_scores)
+
+        search_dir = _prepare_search_dir(output_dir, shard_count, [self.docs[doc_id] for doc_id in live])
+        for index, shard in enumerate(shards):
+            with open(search_dir / f"shard-{index}.json", 'w', encoding='utf-8') as f:
+                json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+        return shard_count
+
+
+class _SpillFiles:
+    """按编号分桶、追加写入的临时文件，缓冲的行数超过 SPILL_LINES 时写出"""
+
+    def __init__(self, directory: Path, prefix: str, count: int):
+        self.paths = [directory / f"{prefix}-{index}.txt" for index in range(count)]
+        self.buffers: List[List[str]] = [[] for _ in range(count)]
+        self.buffered = 0
+
+    def add(self, index: int, line: str):
+        self.buffers[index].append(line)
+        self.buffered += 1
+        if self.buffered >= SPILL_LINES:
+            self.flush()
+
+    def flush(self):
+        for path, buffer in zip(self.paths, self.buffers):
+            if buffer:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.writelines(buffer)
+                buffer.clear()
+        self.buffered = 0
+
+    def take(self, index: int) -> List[str]:
+        """读出并删除一个桶（调用前需要 flush）"""
+        path = self.paths[index]
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        path.unlink()
+        return lines
+
+
+class SpillingSearchIndexBuilder(SearchIndexBuilder):
+    """
+    倒排记录写入临时文件而不是留在内存中的 SearchIndexBuilder，用于非常大的词汇表
+
+    add_page 把 (词, 文档编号, 分数) 按词的哈希追加到 MAX_SHARDS 个临时桶中；write 时逐个桶汇总，
+    再按最终的分片数重新分桶并逐个分片写出。内存占用取决于最大的桶和分片，而不是页面总数
+    （文档列表仍在内存中，每个页面只有 URL 和标题）。输出与 SearchIndexBuilder 完全相同。
+    倒排记录在 write 时被消耗，不支持替换或删除页面，每个页面只能添加一次
+    """
+
+    def __init__(self, spill_dir: Optional[Path] = None):
+        super().__init__()
+        self.spill_dir = Path(tempfile.mkdtemp(prefix="search-index-", dir=spill_dir))
+        self.records = _SpillFiles(self.spill_dir, "records", MAX_SHARDS)
+
+    def add_page(self, url: str, title: str, headings: List[str], body: str):
+        """添加一个页面"""
+        if url in self._doc_ids:
+            raise ValueError(f"SpillingSearchIndexBuilder 不支持替换页面: {url}")
+        doc_id = self._doc_ids[url] = len(self.docs)
+        self.docs.append((url, title))
+        for token, score in self._page_scores(title, headings, body).items():
+            self.records.add(shard_of(token, MAX_SHARDS), f"{token}\t{doc_id}\t{score}\n")
+
+    def remove_page(self, url: str):
+        raise NotImplementedError("SpillingSearchIndexBuilder 不支持删除页面")
+
+    def write(self, output_dir: Path) -> int:
+        """写出与 SearchIndexBuilder.write 相同的文件，返回分片数；结束后删除临时文件"""
+        try:
+            self.records.flush()
+            # 第一遍：逐个桶汇总每个词的倒排列表（同一个词只会出现在一个桶中），同时统计词数
+            entries = _SpillFiles(self.spill_dir, "entries", MAX_SHARDS)
+            token_count = 0
+            for bucket in range(MAX_SHARDS):
+                postings: Dict[str, Dict[int, int]] = {}
+                for line in self.records.take(bucket):
+                    token, doc_id, score = line.rstrip('\n').split('\t')
+                    postings.setdefault(token, {})[int(doc_id)] = int(score)
+                token_count += len(postings)
+                for token, doc_scores in postings.items():
+                    entries.add(bucket, f"{token}\t{json.dumps(_flatten(doc_scores.items()), separators=(',', ':'))}\n")
+                entries.flush()
+
+            # 第二遍：按最终分片数重新分桶，然后逐个分片排序写出
+            shard_count = _shard_count(token_count)
+            if shard_count == MAX_SHARDS:
+                shards = entries
+            else:
+                shards = _SpillFiles(self.spill_dir, "shard", shard_count)
+                for bucket in range(MAX_SHARDS):
+                    for line in entries.take(bucket):
+                        shards.add(shard_of(line[:line.index('\t')], shard_count), line)
+                shards.flush()
+
+            search_dir = _prepare_search_dir(output_dir, shard_count, self.docs)
+            for index in range(shard_count):
+                lines = shards.take(index)
+                lines.sort(key=lambda line: line[:line.index('\t')])
+                with open(search_dir / f"shard-{index}.json", 'w', encoding='utf-8') as f:
+                    f.write('{')
+                    for position, line in enumerate(lines):
+                        token, flat = line.rstrip('\n').split('\t')
+                        f.write(("," if position else "") + json.dumps(token, ensure_ascii=False) + ":" + flat)
+                    f.write('}')
+            return shard_count
+        finally:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+def _shard_count(token_count: int) -> int:
+    return max(1, min(MAX_SHARDS, -(-token_count // TOKENS_PER_SHARD)))
+
+
+def _flatten(doc_scores) -> List[int]:
+    """[(文档编号, 分数), ...] 按分数降序、文档编号升序展开为 [文档编号, 分数, ...]"""
+    flat: List[int] = []
+    for doc_id, score in sorted(doc_scores, key=lambda kv: (-kv[1], kv[0])):
+        flat.extend((doc_id, score))
+    return flat
+
+
+def _prepare_search_dir(output_dir: Path, shard_count: int, docs: List[Tuple[str, str]]) -> Path:
+    """创建 search/ 目录，删除旧的分片并写出 docs.json"""
+    search_dir = output_dir / SEARCH_DIR
+    search_dir.mkdir(parents=True, exist_ok=True)
+    for old in search_dir.glob("shard-*.json"):
+        old.unlink()
+    with open(search_dir / "docs.json", 'w', encoding='utf-8') as f:
+        json.dump({"shards": shard_count, "docs": [list(doc) for doc in docs]},
+                  f, ensure_ascii=False, separators=(',', ':'))
+    return search_dir
+
+
+# 浏览器端搜索脚本：按需加载分片，对所有查询词的结果取交集并按分数排序
+SEARCH_JS = r"""(function () {
+    var script = document.currentScript;
+    var root = script.getAttribute('data-root') || '';
+    var input = document.getElementById('search-input');
+    var list = document.getElementById('search-results');
+    if (!input || !list) return;
+
+    var meta = null;
+    var shards = {};
+
+    function fetchJSON(url) {
+        return fetch(url).then(function (r) { return r.json(); });
+    }
+
+    function loadMeta() {
+        if (!meta) meta = fetchJSON(root + 'search/docs.json');
+        return meta;
+    }
+
+    function loadShard(n) {
+        if (!shards[n]) shards[n] = fetchJSON(root + 'search/shard-' + n + '.json');
+        return shards[n];
+    }
+
+    function tokenize(text) {
+        var tokens = [];
+        var re = /[a-z0-9_]+|[\u3400-\u9fff\uf900-\ufaff]+/g;
+        var m;
+        text = text.toLowerCase();
+        while ((m = re.exec(text)) !== null) {
+            var run = Array.from(m[0]);
+            if (run[0] < '\u3400') {
+                if (run.length >= 2) tokens.push(m[0]);
+            } else if (run.length === 1) {
+                tokens.push(run[0]);
+            } else {
+                for (var i = 0; i < run.length - 1; i++) tokens.push(run[i] + run[i + 1]);
+            }
+        }
+        return tokens;
+    }
+
+    function shardOf(token, count) {
+        var h = 0x811c9dc5;
+        for (var ch of token) {
+            h ^= ch.codePointAt(0);
+            h = Math.imul(h, 0x01000193) >>> 0;
+        }
+        return h % count;
+    }
+
+    function render(docs, ranked) {
+        list.innerHTML = '';
+        ranked.slice(0, 20).forEach(function (id) {
+            var li = document.createElement('li');
+            var a = document.createElement('a');
+            a.href = root + docs[id][0];
+            a.textContent = docs[id][1];
+            li.appendChild(a);
+            list.appendChild(li);
+        });
+        if (!ranked.length) {
+            var li = document.createElement('li');
+            li.className = 'search-empty';
+            li.textContent = '没有找到结果';
+            list.appendChild(li);
+        }
+    }
+
+    var pending = 0;
+    function search() {
+        var query = input.value.trim();
+        var seq = ++pending;
+        var tokens = Array.from(new Set(tokenize(query)));
+        if (!tokens.length) { list.innerHTML = ''; return; }
+        loadMeta().then(function (m) {
+            return Promise.all(tokens.map(function (t) {
+                return loadShard(shardOf(t, m.shards)).then(function (s) { return s[t] || []; });
+            })).then(function (postings) {
+                if (seq !== pending) return;
+                var scores = null;
+                postings.forEach(function (flat) {
+                    var next = {};
+                    for (var i = 0; i < flat.length; i += 2) {
+                        if (scores === null || flat[i] in scores) {
+                            next[flat[i]] = (scores ? scores[flat[i]] : 0) + flat[i + 1];
+                        }
+                    }
+                    scores = next;
+                });
+                var ranked = Object.keys(scores).map(Number).sort(function (a, b) {
+                    return scores[b] - scores[a] || a - b;
+                });
+                render(m.docs, ranked);
+            });
+        });
+    }
+
+    var timer = null;
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(search, 80);
+    });
+})();
+"""
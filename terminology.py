@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+术语表检查：把术语映射表（英文 -> 中文译名）编译成一个正则表达式，
+一次扫描就能找出文本中出现的所有术语和译名
+
+- 检查译文是否统一使用了术语表中的译名（例如 Warp 在同一篇译文中既译作"线程束"又保留为 Warp）
+- 翻译时只把当前分段中出现的术语放进提示词，而不是每次请求都附带完整的术语表
+
+    python terminology.py                      # 检查 content/ 与 translated/ 中的全部文件
+    python terminology.py --strict             # 有问题时以非零状态退出
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from markdown_blocks import is_verbatim, split_blocks
+
+
+# 术语翻译映射表
+TERM_MAPPING = {
+    # 硬件相关
+    "Streaming Multiprocessor": "流式多处理器",
+    "SM": "流式多处理器",
+    "Core": "核心",
+    "CUDA Core": "CUDA核心",
+    "Tensor Core": "Tensor核心",
+    "Special Function Unit": "特殊函数单元",
+    "SFU": "特殊函数单元",
+    "Load/Store Unit": "加载/存储单元",
+    "LSU": "加载/存储单元",
+    "Warp Scheduler": "Warp调度器",
+    "Tensor Memory Accelerator": "Tensor内存加速器",
+    "TMA": "Tensor内存加速器",
+    "Texture Processing Cluster": "纹理处理簇",
+    "TPC": "纹理处理簇",
+    "Graphics Processing Cluster": "图形处理簇",
+    "GPU Processing Cluster": "GPU处理簇",
+    "GPC": "图形/GPU处理簇",
+    "Register File": "寄存器文件",
+    "L1 Data Cache": "L1数据缓存",
+    "Tensor Memory": "Tensor内存",
+    "GPU RAM": "GPU内存",
+
+    # 软件相关
+    "Thread": "线程",
+    "Warp": "线程束",
+    "Cooperative Thread Array": "协作线程数组",
+    "CTA": "协作线程数组",
+    "Kernel": "内核",
+    "Thread Block": "线程块",
+    "Thread Block Grid": "线程块网格",
+    "Thread Hierarchy": "线程层次结构",
+    "Memory Hierarchy": "内存层次结构",
+    "Registers": "寄存器",
+    "Shared Memory": "共享内存",
+    "Global Memory": "全局内存",
+
+    # CUDA工具
+    "CUDA Driver API": "CUDA驱动API",
+    "CUDA Runtime API": "CUDA运行时API",
+    "NVIDIA Management Library": "NVIDIA管理库",
+    "NVML": "NVIDIA管理库",
+    "Streaming ASSembler": "流式汇编器",
+    "SASS": "流式汇编器",
+    "Parallel Thread eXecution": "并行线程执行",
+    "PTX": "并行线程执行",
+    "Compute Capability": "计算能力",
+
+    # 性能相关
+    "Performance Bottleneck": "性能瓶颈",
+    "Roofline Model": "屋顶线模型",
+    "Compute-bound": "计算受限",
+    "Memory-bound": "内存受限",
+    "Arithmetic Intensity": "算术强度",
+    "Overhead": "开销",
+    "Little's Law": "利特尔定律",
+    "Memory Bandwidth": "内存带宽",
+    "Arithmetic Bandwidth": "算术带宽",
+    "Latency Hiding": "延迟隐藏",
+    "Warp Execution State": "Warp执行状态",
+    "Active Cycle": "活跃周期",
+    "Occupancy": "占用率",
+    "Pipe Utilization": "流水线利用率",
+    "Peak Rate": "峰值速率",
+    "Issue Efficiency": "发射效率",
+    "Streaming Multiprocessor Utilization": "流式多处理器利用率",
+    "Warp Divergence": "Warp分歧",
+    "Branch Efficiency": "分支效率",
+    "Memory Coalescing": "内存合并",
+    "Bank Conflict": "Bank冲突",
+    "Register Pressure": "寄存器压力",
+}
+
+# 检查结果的类型
+MIXED = "mixed"                # 同一篇译文中既使用了译名，又直接保留了英文
+UNTRANSLATED = "untranslated"  # 没有使用译名，只保留了英文
+MISSING = "missing"            # 译名和英文都没有出现（通常是使用了其他译法）
+
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_INLINE_CODE_RE = re.compile(r'(`+).*?\1')
+_LINK_TARGET_RE = re.compile(r'\]\([^)\n]*\)')
+_TAG_RE = re.compile(r'<[^>\n]+>')
+_URL_RE = re.compile(r'https?://\S+')
+# 英文（字母或数字）与汉字之间的空白可有可无（"CUDA 核心" 与 "CUDA核心" 是同一个译名）
+_LATIN_CJK_SPACE_RE = re.compile(r'(?<=[A-Za-z0-9])\s+(?=[\u3400-\u9fff])|(?<=[\u3400-\u9fff])\s+(?=[A-Za-z0-9])')
+
+# 括号中的英文是"中文译名 (English)"格式的注释，向前最多查看的字符数
+_ANNOTATION_WINDOW = 80
+
+
+def prose(text: str) -> str:
+    """去掉 HTML 注释、代码块、行内代码、链接地址、HTML 标签和 URL，只保留需要翻译的文字"""
+    blocks = [block for block in split_blocks(_COMMENT_RE.sub(' ', text)) if not is_verbatim(block)]
+    text = '\n\n'.join(blocks)
+    text = _INLINE_CODE_RE.sub(' ', text)
+    text = _LINK_TARGET_RE.sub(']', text)
+    text = _TAG_RE.sub(' ', text)
+    return _URL_RE.sub(' ', text)
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    把一组词编译成按前缀共享的正则表达式（用小写匹配，空格匹配任意空白，
+    英文与汉字相邻处允许有任意空白）
+
+    每个位置只沿前缀树向下比较，不逐个尝试所有词；可选分组是贪婪的，
+    同一位置优先匹配最长的词
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, dict], prev: str = '') -> str:
+        alternatives = [(r'\s*' if _LATIN_CJK_SPACE_RE.match(prev + ' ' + ch, 1) else '')
+                        + (r'\s+' if ch == ' ' else re.escape(ch)) + emit(child, ch)
+                        for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+
+def _fold(text: str) -> str:
+    return _LATIN_CJK_SPACE_RE.sub('', ' '.join(text.split())).lower()
+
+
+def _is_acronym(term: str) -> bool:
+    """全大写的缩写（SM、PTX 等）区分大小写，并且按惯例可以在译文中保留英文"""
+    return term.isupper()
+
+
+class Terminology:
+    """
+    编译后的术语表
+
+    英文术语和中文译名合并为一个正则表达式，scan() 对文本只做一次扫描。
+    英文术语不区分大小写（缩写除外），允许复数形式，两侧不能紧接英文字母或数字
+    """
+
+    def __init__(self, mapping: Optional[Dict[str, str]] = None):
+        self.mapping = dict(TERM_MAPPING if mapping is None else mapping)
+        self._terms = {_fold(term): term for term in self.mapping}
+        self._renderings = {_fold(rendering): rendering for rendering in self.mapping.values()}
+        self.pattern = re.compile(
+            f'(?P<zh>{_trie_regex(self._renderings)})'
+            f'|(?<![A-Za-z0-9_])(?P<en>{_trie_regex(self._terms)})(?:e?s)?(?![A-Za-z0-9_])',
+            re.IGNORECASE,
+        )
+        digest = hashlib.sha1(json.dumps(self.mapping, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        self.version = digest.hexdigest()[:12]
+
+    def _term(self, text: str) -> Optional[str]:
+        """匹配到的英文对应的术语；缩写必须大小写完全一致"""
+        term = self._terms.get(_fold(text))
+        if term is not None and _is_acronym(term) and ' '.join(text.split()) != term:
+            return None
+        return term
+
+    def scan(self, text: str) -> Tuple[Counter, Counter, Counter]:
+        """
+        扫描一段文字（调用前用 prose() 去掉代码和链接地址）
+
+        Returns:
+            (直接出现的英文术语, 出现在括号注释中的英文术语, 中文译名) 的出现次数
+        """
+        bare: Counter = Counter()
+        annotated: Counter = Counter()
+        renderings: Counter = Counter()
+        for match in self.pattern.finditer(text):
+            if match.group('zh') is not None:
+                renderings[self._renderings[_fold(match.group('zh'))]] += 1
+                continue
+            term = self._term(match.group('en'))
+            if term is None:
+                continue
+            window = text[max(0, match.start() - _ANNOTATION_WINDOW):match.start()]
+            opened = max(window.rfind('('), window.rfind('（'))
+            closed = max(window.rfind(')'), window.rfind('）'), window.rfind('\n'))
+            (annotated if opened > closed else bare)[term] += 1
+        return bare, annotated, renderings
+
+    def terms_in(self, text: str) -> List[str]:
+        """text 中出现的英文术语，按第一次出现的顺序（代码和链接地址中的不算）"""
+        found: Dict[str, None] = {}
+        for match in self.pattern.finditer(prose(text)):
+            if match.group('en') is not None:
+                term = self._term(match.group('en'))
+                if term is not None:
+                    found.setdefault(term)
+        return list(found)
+
+    def format_terms(self, terms: Iterable[str]) -> str:
+        """术语列表的提示词片段"""
+        return '\n'.join(f"   - {term} → {self.mapping[term]}" for term in terms)
+
+    def prompt_section(self, text: str) -> str:
+        """只包含 text 中出现的术语的提示词片段，没有术语时为空字符串"""
+        terms = self.terms_in(text)
+        if not terms:
+            return ""
+        return "本段涉及的术语，请使用以下译法：\n" + self.format_terms(terms)
+
+    def check(self, source: str, translation: str) -> List[Tuple[str, str, str, int, int]]:
+        """
+        检查译文中术语的译法
+
+        只检查原文中出现的术语；缩写按惯例可以保留英文，不检查。
+        括号中的英文（"线程束 (warp)"）是注释，不算保留英文
+
+        Returns:
+            [(术语, 问题类型, 术语表中的译名, 译名出现次数, 保留英文的次数), ...]，按术语排序
+        """
+        source_terms, source_annotated, _ = self.scan(prose(source))
+        bare, _, renderings = self.scan(prose(translation))
+        issues = []
+        for term in sorted(set(source_terms) | set(source_annotated)):
+            if _is_acronym(term):
+                continue
+            expected = self.mapping[term]
+            rendered = renderings[expected]
+            untranslated = bare[term]
+            if rendered and untranslated:
+                kind = MIXED
+            elif untranslated:
+                kind = UNTRANSLATED
+            elif not rendered:
+                kind = MISSING
+            else:
+                continue
+            issues.append((term, kind, expected, rendered, untranslated))
+        return issues
+
+
+def check_directory(source_dir: Path, translation_dir: Path,
+                    terminology: Terminology) -> Dict[str, List[Tuple[str, str, str, int, int]]]:
+    """检查 translation_dir 中每个有对应原文的译文，返回 {相对路径: 问题列表}（只包含有问题的文件）"""
+    from page_metadata import iter_markdown_files
+
+    results = {}
+    for entry in iter_markdown_files(translation_dir):
+        rel_path = Path(entry.path).relative_to(translation_dir)
+        source_file = source_dir / rel_path
+        if not source_file.exists():
+            continue
+        issues = terminology.check(source_file.read_text(encoding='utf-8'),
+                                   Path(entry.path).read_text(encoding='utf-8'))
+        if issues:
+            results[rel_path.as_posix()] = issues
+    return results
+
+
+_KIND_LABELS = {MIXED: "译名与英文混用", UNTRANSLATED: "未翻译", MISSING: "未使用术语表译名"}
+
+
+def main(argv: Optional[List[str]] = None):
+    """主函数"""
+    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="检查译文的术语一致性")
+    parser.add_argument("--source", type=Path, default=script_dir / "content",
+                        help="原文目录（默认 content/）")
+    parser.add_argument("--translation", type=Path, default=script_dir / "translated",
+                        help="译文目录（默认 translated/）")
+    parser.add_argument("--kind", choices=sorted(_KIND_LABELS), action="append",
+                        help="只报告这些类型的问题（可以重复指定，默认全部）")
+    parser.add_argument("--strict", action="store_true", help="发现问题时以非零状态退出")
+    args = parser.parse_args(argv)
+
+    for directory in (args.source, args.translation):
+        if not directory.exists():
+            print(f"错误: 目录不存在: {directory}")
+            sys.exit(1)
+
+    terminology = Terminology()
+    results = check_directory(args.source, args.translation, terminology)
+    if args.kind:
+        results = {path: [issue for issue in issues if issue[1] in args.kind] for path, issues in results.items()}
+        results = {path: issues for path, issues in results.items() if issues}
+
+    by_term: Dict[str, Counter] = {}
+    for path, issues in results.items():
+        print(f"\n{path}")
+        for term, kind, expected, rendered, untranslated in issues:
+            print(f"  {_KIND_LABELS[kind]}: {term} → {expected}（译名 {rendered} 次，英文 {untranslated} 次）")
+            by_term.setdefault(term, Counter())[kind] += 1
+
+    if by_term:
+        print("\n按术语汇总（文件数）:")
+        for term, kinds in sorted(by_term.items(), key=lambda item: (-sum(item[1].values()), item[0])):
+            counts = "，".join(f"{_KIND_LABELS[kind]} {count}" for kind, count in sorted(kinds.items()))
+            print(f"  {term} → {terminology.mapping[term]}: {counts}")
+    print(f"\n{len(results)} 个文件存在术语问题")
+
+    if args.strict and results:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
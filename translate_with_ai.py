@@ -4,45 +4,49 @@ GPU Glossary AI 翻译工具
 使用 SiliconFlow API (DeepSeek-V3) 进行专业翻译
 """
 
+import argparse
+import hashlib
+import json
 import os
+import random
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 import requests
 
+from http_client import HttpClient
+from markdown_blocks import chunk_blocks, is_verbatim, join_blocks, split_blocks
+from page_metadata import carry_nav_metadata, front_matter_length, nav_metadata, set_front_matter
+from terminology import Terminology
+from translation_memory import TranslationMemory
+from translation_journal import DONE, FAILED, IN_FLIGHT, TranslationJournal, source_hash
 
-class AITranslator:
-    """使用 SiliconFlow AI 进行翻译"""
-    
-    def __init__(self):
-        """
-        初始化翻译器，使用 SiliconFlow API
-        """
-        # 从环境变量读取 API Key，确保安全
-        self.api_key = os.getenv("SILICONFLOW_API_KEY")
-        if not self.api_key:
-            raise ValueError(
-                "未找到 SILICONFLOW_API_KEY 环境变量。\n"
-                "请设置环境变量: export SILICONFLOW_API_KEY='your-api-key'"
-            )
-        self.base_url = "https://api.siliconflow.cn/v1"
-        self.model = "Pro/deepseek-ai/DeepSeek-V3"
-    
-    def translate_markdown(self, content: str, context: str = "") -> str:
-        """
-        翻译 Markdown 内容
-        
-        Args:
-            content: 要翻译的内容
-            context: 上下文信息（文件路径等）
-        
-        Returns:
-            翻译后的内容
-        """
-        system_prompt = """你是一位专业的技术文档翻译专家，特别擅长 GPU、CUDA 和并行计算相关的技术文档翻译。
+
+DEFAULT_BASE_URL = "https://api.siliconflow.cn/v1"
+DEFAULT_MODEL = "Pro/deepseek-ai/DeepSeek-V3"
+
+# 术语表版本：修改术语约定后递增，翻译记忆中的旧译文随之失效
+GLOSSARY_VERSION = "1"
+
+_PROMPT_HEAD = """你是一位专业的技术文档翻译专家，特别擅长 GPU、CUDA 和并行计算相关的技术文档翻译。
 
 翻译要求：
 1. 保持 Markdown 格式完整，包括标题、链接、代码块等
-2. 专业术语保持一致性，常见术语如下：
+"""
+
+_PROMPT_RULES = """3. 首次出现专业术语时，使用"中文翻译 (English)"格式
+4. 代码、命令、API名称等保持英文不翻译
+5. 链接地址不翻译，但链接文本要翻译
+6. 保持技术准确性，不要过度意译
+7. 语言要通顺自然，符合中文技术文档习惯
+8. 保留所有的换行和段落结构
+
+请直接返回翻译后的 Markdown 内容，不要添加任何解释。"""
+
+SYSTEM_PROMPT = _PROMPT_HEAD + """2. 专业术语保持一致性，常见术语如下：
    - Streaming Multiprocessor → 流式多处理器 (SM)
    - Warp → 线程束
    - Thread Block → 线程块
@@ -54,25 +58,247 @@ class AITranslator:
    - Occupancy → 占用率
    - Latency Hiding → 延迟隐藏
    
-3. 首次出现专业术语时，使用"中文翻译 (English)"格式
-4. 代码、命令、API名称等保持英文不翻译
-5. 链接地址不翻译，但链接文本要翻译
-6. 保持技术准确性，不要过度意译
-7. 语言要通顺自然，符合中文技术文档习惯
-8. 保留所有的换行和段落结构
+""" + _PROMPT_RULES
 
-请直接返回翻译后的 Markdown 内容，不要添加任何解释。"""
+# 按分段注入术语时使用的系统提示词：术语表不再固定写在这里，
+# 而是由 terminology.Terminology 只把分段中出现的术语附加到用户消息中
+TERMS_SYSTEM_PROMPT = _PROMPT_HEAD + """2. 专业术语保持一致性，按用户消息中给出的译法翻译
+""" + _PROMPT_RULES
 
-        user_prompt = f"""请将以下 GPU Glossary 的 Markdown 文档翻译成中文：
+# 多个块一起翻译时附加的说明
+BLOCK_INSTRUCTION = """文档由若干块组成，每块前有一行 `<!-- block N -->` 标记。
+请原样保留所有标记（包括编号和顺序），只翻译标记之间的内容。"""
 
-{context}
+# 多个文档合并为一次请求时附加的说明
+BATCH_INSTRUCTION = """本次请求包含多个互相独立的文档，每个文档以一行 `<!-- document N -->` 标记开始，
+文档内的每块前有一行 `<!-- block N -->` 标记。
+请原样保留所有标记（包括编号和顺序），只翻译标记之间的内容，不要合并或省略任何块。"""
 
----
+# 每次批量请求最多包含的文档数，限制单次失败的影响范围
+BATCH_MAX_DOCUMENTS = 8
+
+_BLOCK_MARKER_RE = re.compile(r'^<!-- block (\d+) -->[ \t]*$', re.MULTILINE)
+_DOCUMENT_MARKER_RE = re.compile(r'^<!-- document (\d+) -->[ \t]*\n?', re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估计文本的 token 数，用于限流
+    
+    中文大约每个字符 1 个 token，英文大约每 4 个字符 1 个 token
+    """
+    cjk = sum(1 for ch in text if '\u3400' <= ch <= '\u9fff')
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+class TokenBucket:
+    """线程安全的令牌桶，按每分钟的速率补充"""
+    
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def pause(self, seconds: float):
+        """在 seconds 秒内不再发放令牌（收到 429 时让所有线程一起等待）"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + max(seconds, 0.0))
+    
+    def acquire(self, amount: float = 1.0):
+        """取出 amount 个令牌，不足或暂停中时阻塞等待"""
+        # 单次请求超过桶容量时按容量计算，避免永远等待
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    # 暂停期间不补充令牌，恢复后各线程仍按速率依次发出请求
+                    self.updated = now
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= amount:
+                        self.tokens -= amount
+                        return
+                    wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
 
-{content}"""
 
+class TransientAPIError(Exception):
+    """可以重试的 API 错误（429、5xx、网络错误）"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None,
+                 status: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status = status
+
+
+class StreamSink:
+    """
+    流式输出的接收端
+    
+    记录首 token 时间和生成的 token 数；提供文件句柄时把增量直接写入文件。
+    提供 head 时，开头的 front matter 先缓冲，经 head 改写后再写出（用于补回导航字段）。
+    写入的内容只保留摘要用于最后核对，不在内存中再存一份。
+    按块翻译时用 metrics_only() 创建只统计、不写文件的子接收端
+    """
+    
+    def __init__(self, fh=None, parent: Optional["StreamSink"] = None,
+                 head: Optional[Callable[[str], str]] = None):
+        self.fh = fh
+        self.parent = parent
+        self.head = head
+        self.start = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.last_token_at: Optional[float] = None
+        self.completion_tokens = 0
+        self._file_start = fh.tell() if fh is not None else 0
+        self._lock = threading.Lock()
+        self._reset_output()
+    
+    def _reset_output(self):
+        self._pending = ""  # 还没确定 front matter 边界的开头部分
+        self._head_done = self.head is None
+        self._digest = hashlib.sha256()
+    
+    def metrics_only(self) -> "StreamSink":
+        return StreamSink(parent=self)
+    
+    def add_tokens(self, count: int):
+        """记录生成的 token"""
+        now = time.monotonic()
+        with self._lock:
+            if self.first_token_at is None:
+                self.first_token_at = now
+            self.last_token_at = now
+            self.completion_tokens += count
+        if self.parent is not None:
+            self.parent.add_tokens(count)
+    
+    def write(self, text: str):
+        """接收一段增量文本"""
+        self.add_tokens(1)
+        self.emit(text)
+    
+    def emit(self, text: str):
+        """把译文写入文件（不计入 token 数），按块翻译时用它按顺序写出各块"""
+        if self.fh is None:
+            return
+        if not self._head_done:
+            self._pending += text
+            length = front_matter_length(self._pending)
+            if length is None:
+                return
+            text = self.head(self._pending[:length]) + self._pending[length:]
+            self._pending = ""
+            self._head_done = True
+        self.fh.write(text)
+        self._digest.update(text.encode('utf-8'))
+    
+    def flush(self):
+        """写出仍在缓冲的开头部分（译文很短、没有等到 front matter 结束时）"""
+        if self.fh is not None and not self._head_done:
+            text = self.head(self._pending)
+            self._pending = ""
+            self._head_done = True
+            self.fh.write(text)
+            self._digest.update(text.encode('utf-8'))
+    
+    def reset(self):
+        """流中断重试前，丢弃已写入文件的增量"""
+        if self.fh is not None:
+            self.fh.seek(self._file_start)
+            self.fh.truncate()
+            self._reset_output()
+    
+    def wrote(self, text: str) -> bool:
+        """文件中写入的内容是否正好是 text"""
+        return self.fh is not None and self._digest.digest() == hashlib.sha256(text.encode('utf-8')).digest()
+    
+    @property
+    def ttft(self) -> Optional[float]:
+        """首 token 延迟（秒）"""
+        return None if self.first_token_at is None else self.first_token_at - self.start
+    
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """首 token 之后的生成速度"""
+        if self.first_token_at is None or self.last_token_at is None:
+            return None
+        return self.completion_tokens / max(self.last_token_at - self.first_token_at, 1e-3)
+
+
+class AITranslator:
+    """使用 SiliconFlow AI 进行翻译"""
+    
+    # 429/5xx/网络错误的最大重试次数
+    MAX_RETRIES = 5
+    # 退避等待的上限（秒）
+    MAX_BACKOFF = 60
+    # 单个分段翻译失败后的重试次数（在 chat_completion 自身的重试之外）
+    CHUNK_RETRIES = 2
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 model: Optional[str] = None, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, memory: Optional[TranslationMemory] = None,
+                 glossary_version: str = GLOSSARY_VERSION, chunk_chars: int = 6000,
+                 chunk_workers: int = 4, stream: bool = False, http_client: Optional[HttpClient] = None,
+                 terminology: Optional[Terminology] = None):
+        """
+        初始化翻译器，使用 SiliconFlow API
+        
+        Args:
+            api_key: API Key，默认读取 SILICONFLOW_API_KEY 环境变量
+            base_url: OpenAI 兼容接口地址，默认 SiliconFlow
+            model: 模型名，默认读取 TRANSLATION_MODEL 环境变量
+            requests_per_minute: 每分钟请求数上限（所有线程共享），None 表示不限制
+            tokens_per_minute: 每分钟 token 数上限（所有线程共享，按估算值计算），None 表示不限制
+            memory: 翻译记忆，None 表示每次整篇翻译
+            glossary_version: 术语表版本，参与翻译记忆的键计算
+            chunk_chars: 单次请求的原文长度上限（字符），更长的文档按块边界切分
+            chunk_workers: 单个文档内并行翻译的分段数
+            stream: 使用流式（SSE）响应，增量实时写入临时文件（按块翻译时以块为单位按顺序写入）
+            http_client: 共享的 HTTP 客户端，默认新建一个（连接池大小 16）
+            terminology: 术语表；提供时每次请求只附带原文中出现的术语，代替系统提示词中固定的术语列表
+        """
+        # 从环境变量读取 API Key，确保安全
+        self.api_key = api_key or os.getenv("SILICONFLOW_API_KEY")
+        if not self.api_key:
+            raise ValueError(
+                "未找到 SILICONFLOW_API_KEY 环境变量。\n"
+                "请设置环境变量: export SILICONFLOW_API_KEY='your-api-key'"
+            )
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.model = model or os.getenv("TRANSLATION_MODEL", DEFAULT_MODEL)
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.memory = memory
+        self.glossary_version = glossary_version
+        self.chunk_chars = chunk_chars
+        self.chunk_workers = max(1, chunk_workers)
+        self.stream = stream
+        self.http = http_client or HttpClient(pool_size=16, timeout=(10, 120))
+        self.terminology = terminology
+        self.system_prompt = TERMS_SYSTEM_PROMPT if terminology is not None else SYSTEM_PROMPT
+        
+        # 统计信息（所有线程共享）
+        self.stats_lock = threading.Lock()
+        self.total_tokens = 0
+        self.retries = 0
+        self.file_stats: Dict[str, dict] = {}  # 每个文件的耗时、首 token 延迟和生成速度
+        self.errors: Dict[str, str] = {}  # 每个失败文件最近一次的错误
+        self.term_requests = 0  # 注入了术语的请求数
+        self.term_tokens = 0  # 注入的术语片段的估算 token 数
+    
+    def _post_chat(self, messages: list) -> dict:
+        """发送一次 /chat/completions 请求，429/5xx/网络错误抛出 TransientAPIError"""
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -80,26 +306,411 @@ class AITranslator:
                 },
                 json={
                     "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                    "messages": messages,
                     "temperature": 0.3
+                }
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientAPIError(str(e))
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise TransientAPIError(
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                float(retry_after) if retry_after and retry_after.isdigit() else None,
+                response.status_code,
+            )
+        if not response.ok:
+            print(f"响应内容: {response.text}")
+        response.raise_for_status()
+        return response.json()
+    
+    def _post_chat_stream(self, messages: list, sink: Optional[StreamSink]) -> dict:
+        """
+        以 SSE 流式发送一次 /chat/completions 请求，增量文本实时交给 sink
+        
+        返回与非流式接口相同结构的结果；连接中断同样抛出 TransientAPIError
+        """
+        try:
+            response = self.http.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": 0.3,
+                    "stream": True
                 },
-                timeout=120
+                stream=True
             )
-            
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientAPIError(str(e))
+        
+        with response:
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = response.headers.get("Retry-After")
+                raise TransientAPIError(
+                    f"HTTP {response.status_code}: {response.text[:200]}",
+                    float(retry_after) if retry_after and retry_after.isdigit() else None,
+                    response.status_code,
+                )
+            if not response.ok:
+                print(f"响应内容: {response.text}")
             response.raise_for_status()
-            result = response.json()
-            translated = result['choices'][0]['message']['content']
-            return translated
             
-        except Exception as e:
-            print(f"翻译错误: {e}")
-            print(f"响应内容: {response.text if 'response' in locals() else '无'}")
-            return content
+            response.encoding = 'utf-8'
+            parts: List[str] = []
+            usage = None
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        break
+                    event = json.loads(data)
+                    usage = event.get('usage') or usage
+                    for choice in event.get('choices') or []:
+                        delta = (choice.get('delta') or {}).get('content')
+                        if delta:
+                            parts.append(delta)
+                            if sink is not None:
+                                sink.write(delta)
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, ValueError) as e:
+                # 连接中断或事件被截断（JSON 不完整）都按可重试错误处理
+                raise TransientAPIError(f"流式响应中断: {e}")
+        
+        # 服务端报告了准确的 token 数时，用它修正按增量个数的估计
+        if usage and sink is not None:
+            sink.add_tokens(usage.get('completion_tokens', len(parts)) - len(parts))
+        return {"choices": [{"message": {"content": ''.join(parts)}}], "usage": usage or {}}
     
-    def translate_file(self, file_path: Path, output_path: Path, context: str = "") -> bool:
+    def chat_completion(self, messages: list, sink: Optional[StreamSink] = None) -> str:
+        """
+        调用 /chat/completions 并返回回复内容
+        
+        请求前经过请求数和 token 数两个令牌桶限流；429/5xx 和网络错误
+        按带随机抖动的指数退避重试（有 Retry-After 时以其为下限），429 还会
+        暂停共享令牌桶。开启 stream 时增量文本实时交给 sink
+        """
+        estimated = sum(estimate_tokens(m["content"]) for m in messages) * 2
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            if self.request_bucket:
+                self.request_bucket.acquire()
+            if self.token_bucket:
+                self.token_bucket.acquire(estimated)
+            
+            try:
+                if self.stream:
+                    result = self._post_chat_stream(messages, sink)
+                else:
+                    result = self._post_chat(messages)
+            except TransientAPIError as e:
+                if sink is not None:
+                    sink.reset()
+                if attempt == self.MAX_RETRIES:
+                    raise
+                if e.retry_after is not None:
+                    # 服务端给出的等待时间是下限，只在其上叠加少量抖动
+                    delay = e.retry_after + random.uniform(0, 1)
+                else:
+                    delay = min(self.MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.5)
+                if e.status == 429:
+                    # 限流是整个账号的，暂停共享令牌桶让其他线程一起等待
+                    for bucket in (self.request_bucket, self.token_bucket):
+                        if bucket:
+                            bucket.pause(delay)
+                with self.stats_lock:
+                    self.retries += 1
+                print(f"请求失败（{e}），{delay:.1f} 秒后重试")
+                time.sleep(delay)
+                continue
+            
+            usage = result.get("usage") or {}
+            with self.stats_lock:
+                self.total_tokens += usage.get("total_tokens", estimated)
+            if not self.stream and sink is not None:
+                sink.add_tokens(usage.get("completion_tokens", 0))
+            return result['choices'][0]['message']['content']
+    
+    def _translate_text(self, content: str, context: str = "", instruction: str = "",
+                        sink: Optional[StreamSink] = None) -> str:
+        """发送一次翻译请求，失败时抛出异常"""
+        if self.terminology is not None:
+            terms = self.terminology.prompt_section(content)
+            if terms:
+                instruction = f"{instruction}\n{terms}" if instruction else terms
+                with self.stats_lock:
+                    self.term_requests += 1
+                    self.term_tokens += estimate_tokens(terms)
+        
+        user_prompt = f"""请将以下 GPU Glossary 的 Markdown 文档翻译成中文：
+
+{context}
+{instruction}
+---
+
+{content}"""
+        
+        return self.chat_completion([
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt}
+        ], sink)
+    
+    def _translate_chunk(self, blocks: List[str], context: str, sink: Optional[StreamSink] = None) -> List[str]:
+        """
+        在一次请求中翻译一组块，按标记拆回每个块的译文
+        
+        模型没有完整保留标记时，退回为逐块翻译
+        """
+        if len(blocks) == 1:
+            return [self._translate_text(blocks[0], context, sink=sink).strip()]
+        
+        content = '\n\n'.join(f"<!-- block {i} -->\n{block}" for i, block in enumerate(blocks))
+        response = self._translate_text(content, context, BLOCK_INSTRUCTION, sink)
+        
+        parts = _BLOCK_MARKER_RE.split(response)
+        translated = {int(parts[i]): parts[i + 1].strip() for i in range(1, len(parts) - 1, 2)}
+        if sorted(translated) == list(range(len(blocks))) and all(translated.values()):
+            return [translated[i] for i in range(len(blocks))]
+        
+        print(f"译文中的块标记不完整（{len(translated)}/{len(blocks)}），改为逐块翻译")
+        return [self._translate_text(block, context, sink=sink).strip() for block in blocks]
+    
+    def _translate_chunk_with_retry(self, blocks: List[str], context: str,
+                                    sink: Optional[StreamSink] = None) -> List[str]:
+        """翻译一组块，失败时只重试这一组"""
+        for attempt in range(self.CHUNK_RETRIES + 1):
+            try:
+                return self._translate_chunk(blocks, context, sink)
+            except Exception as e:
+                if attempt == self.CHUNK_RETRIES:
+                    raise
+                print(f"分段翻译失败（{e}），重试 {attempt + 1}/{self.CHUNK_RETRIES}")
+    
+    def _translate_blocks(self, blocks: List[str], context: str,
+                          on_chunk: Optional[Callable[[List[int], List[str]], None]] = None,
+                          sink: Optional[StreamSink] = None) -> List[str]:
+        """
+        翻译多个块：按块边界分组，各组并行翻译后按原顺序拼回
+        
+        Args:
+            blocks: 要翻译的块
+            context: 上下文信息
+            on_chunk: 每组翻译完成后的回调 (块下标, 译文)，用于及时写入翻译记忆
+            sink: 只用于统计的流式接收端
+        
+        某一组最终失败时，其他组照常完成（并已通过 on_chunk 保存），然后抛出异常
+        """
+        groups = chunk_blocks(blocks, self.chunk_chars)
+        results: List[Optional[str]] = [None] * len(blocks)
+        
+        def run(indices: List[int]):
+            translated = self._translate_chunk_with_retry([blocks[i] for i in indices], context, sink)
+            for i, text in zip(indices, translated):
+                results[i] = text
+            if on_chunk:
+                on_chunk(indices, translated)
+        
+        if len(groups) == 1:
+            run(groups[0])
+            return results
+        
+        print(f"分为 {len(groups)} 段并行翻译")
+        errors = []
+        with ThreadPoolExecutor(max_workers=min(len(groups), self.chunk_workers)) as executor:
+            for future in [executor.submit(run, indices) for indices in groups]:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise errors[0]
+        return results
+    
+    def _lookup_blocks(self, content: str):
+        """
+        切分文档并查找可以直接复用的块
+        
+        Returns:
+            (块列表, 记忆键列表, 结果列表, 待翻译的块下标)；代码块和翻译记忆命中的块已填入结果
+        """
+        blocks = split_blocks(content)
+        prompt_id = self.system_prompt + BLOCK_INSTRUCTION
+        if self.terminology is not None:
+            # 注入的术语由块内容和术语表决定，术语表变化时旧译文失效
+            prompt_id += self.terminology.version
+        keys = [TranslationMemory.make_key(block, self.model, prompt_id, self.glossary_version)
+                for block in blocks]
+        
+        results: List[Optional[str]] = [None] * len(blocks)
+        pending = []
+        for i, block in enumerate(blocks):
+            if is_verbatim(block):
+                results[i] = block
+                continue
+            if self.memory is not None:
+                results[i] = self.memory.get(keys[i])
+            if results[i] is None:
+                pending.append(i)
+        return blocks, keys, results, pending
+    
+    def _translate_by_blocks(self, content: str, context: str, sink: Optional[StreamSink] = None) -> str:
+        """
+        按块翻译：代码块原样保留；配置了翻译记忆时，只把未命中的块发送给 API
+        
+        sink 带文件时，开头连续已完成的块立即按顺序写出，每组译文完成后继续往后写
+        """
+        blocks, keys, results, pending = self._lookup_blocks(content)
+        lock = threading.Lock()
+        written = 0
+        
+        def emit_ready():
+            # 把开头连续已有译文的块按顺序写入文件
+            nonlocal written
+            if sink is None:
+                return
+            with lock:
+                while written < len(results) and results[written] is not None:
+                    sink.emit(results[written] + ('\n\n' if written < len(results) - 1 else '\n'))
+                    written += 1
+        
+        emit_ready()
+        if pending:
+            print(f"复用 {len(blocks) - len(pending)}/{len(blocks)} 块（翻译记忆或代码块），翻译 {len(pending)} 块")
+            
+            def save(indices: List[int], translated: List[str]):
+                for index, text in zip(indices, translated):
+                    i = pending[index]
+                    results[i] = text
+                    if self.memory is not None:
+                        self.memory.put(keys[i], blocks[i], text, self.model)
+                emit_ready()
+            
+            # 每组的回复里带有块标记，增量不能直接写入文件，这里只用于统计
+            metrics = sink.metrics_only() if sink is not None else None
+            self._translate_blocks([blocks[i] for i in pending], context, save, metrics)
+        
+        return join_blocks(results)
+    
+    def translate_markdown(self, content: str, context: str = "", sink: Optional[StreamSink] = None) -> str:
+        """
+        翻译 Markdown 内容
+        
+        配置了翻译记忆或文档较长时按块翻译：原文未变化的块直接使用记忆中的译文，
+        长文档在块边界切分为多段并行翻译，每段单独重试
+        
+        Args:
+            content: 要翻译的内容
+            context: 上下文信息（文件路径等）
+            sink: 流式输出的接收端（整篇翻译时增量直接写入其文件，按块翻译时按块的顺序写入）
+        
+        Returns:
+            翻译后的内容；翻译失败时抛出异常（不再返回英文原文）
+        """
+        if self.memory is not None or len(content) > self.chunk_chars:
+            return self._translate_by_blocks(content, context, sink)
+        return self._translate_text(content, context, sink=sink)
+    
+    def translate_batch(self, documents: List[Tuple[str, str]], sink: Optional[StreamSink] = None) -> List[str]:
+        """
+        在一次请求中翻译多个短文档
+        
+        每个文档以 `<!-- document N -->` 开始，文档内待翻译的块以全局编号的
+        `<!-- block N -->` 标记，回复按标记拆回各文档。代码块和翻译记忆命中的块不发送；
+        某个文档的块没有全部带回时，这个文档的结果为 None，由调用方单独翻译
+        
+        Args:
+            documents: [(文档内容, 上下文信息), ...]
+            sink: 只用于统计的流式接收端
+        
+        Returns:
+            与 documents 顺序一致的译文，没有完整带回的文档为 None；请求本身失败时抛出异常
+        """
+        lookups = [self._lookup_blocks(content) for content, _ in documents]
+        
+        parts = []
+        owners = []  # 全局块编号 -> (文档下标, 块下标)
+        for d, (blocks, _, _, pending) in enumerate(lookups):
+            if not pending:
+                continue
+            parts.append(f"<!-- document {d} -->")
+            for i in pending:
+                parts.append(f"<!-- block {len(owners)} -->\n{blocks[i]}")
+                owners.append((d, i))
+        
+        translated: Dict[int, str] = {}
+        if owners:
+            contexts = '\n'.join(f"文档 {d}: {context}" for d, (_, context) in enumerate(documents)
+                                 if lookups[d][3])
+            print(f"批量翻译 {len(documents)} 个文档，共 {len(owners)} 块")
+            response = self._translate_text('\n\n'.join(parts), contexts, BATCH_INSTRUCTION, sink)
+            pieces = _BLOCK_MARKER_RE.split(_DOCUMENT_MARKER_RE.sub('', response))
+            for i in range(1, len(pieces) - 1, 2):
+                index = int(pieces[i])
+                if index < len(owners) and index not in translated:
+                    translated[index] = pieces[i + 1].strip()
+        
+        # 逐个文档校验：所有块都带回且非空才采用
+        complete = [True] * len(documents)
+        for index, (d, _) in enumerate(owners):
+            if not translated.get(index):
+                complete[d] = False
+        for index, (d, i) in enumerate(owners):
+            if not complete[d]:
+                continue
+            blocks, keys, results, _ = lookups[d]
+            results[i] = translated[index]
+            if self.memory is not None:
+                self.memory.put(keys[i], blocks[i], results[i], self.model)
+        
+        outputs: List[Optional[str]] = []
+        for d in range(len(documents)):
+            if complete[d]:
+                outputs.append(join_blocks(lookups[d][2]))
+            else:
+                print(f"批量译文缺少文档 {d} 的部分内容，改为单独翻译")
+                outputs.append(None)
+        return outputs
+    
+    def _record_file_stats(self, file_path: Path, sink: StreamSink):
+        """记录单个文件的首 token 延迟和生成速度"""
+        stats = {
+            "seconds": time.monotonic() - sink.start,
+            "ttft": sink.ttft,
+            "tokens_per_sec": sink.tokens_per_sec,
+        }
+        with self.stats_lock:
+            self.file_stats[str(file_path)] = stats
+        if stats["ttft"] is not None and stats["tokens_per_sec"] is not None:
+            print(f"  首 token {stats['ttft']:.2f} 秒，{stats['tokens_per_sec']:.1f} tokens/秒，"
+                  f"共 {stats['seconds']:.1f} 秒")
+    
+    def _quarantine(self, file_path: Path, quarantine_path: Optional[Path], error: Exception,
+                    partial: str = ""):
+        """记录失败原因；提供隔离路径时把已生成的部分译文写到那里，不覆盖正式译文"""
+        with self.stats_lock:
+            self.errors[str(file_path)] = str(error)
+        if quarantine_path is None:
+            return
+        quarantine_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(quarantine_path, 'w', encoding='utf-8') as f:
+            f.write(f"<!-- 翻译失败: {error} -->\n\n{partial}")
+    
+    def _translated(self, file_path: Path, quarantine_path: Optional[Path]):
+        """翻译成功后清除之前的失败记录和隔离文件"""
+        with self.stats_lock:
+            self.errors.pop(str(file_path), None)
+        if quarantine_path is not None and quarantine_path.exists():
+            quarantine_path.unlink()
+    
+    def translate_file(self, file_path: Path, output_path: Path, context: str = "",
+                       quarantine_path: Optional[Path] = None) -> bool:
         """
         翻译单个文件
         
@@ -107,6 +718,7 @@ class AITranslator:
             file_path: 输入文件路径
             output_path: 输出文件路径
             context: 上下文信息
+            quarantine_path: 翻译失败时保存部分译文和错误的路径，失败时不会写入 output_path
         
         Returns:
             是否成功
@@ -116,75 +728,281 @@ class AITranslator:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # 翻译
-            print(f"正在翻译: {file_path.name}")
-            translated = self.translate_markdown(content, context)
-            
-            # 添加元信息
+            # 元信息
             header = f"""<!--
 原文: {context}
 翻译时间: {time.strftime('%Y-%m-%d %H:%M:%S')}
 -->
 
 """
-            translated = header + translated
             
-            # 保存
+            # 翻译：先写入临时文件（流式模式下增量实时写入），完成后原子替换
+            print(f"正在翻译: {file_path.name}")
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(translated)
+            tmp_path = output_path.with_name(output_path.name + '.part')
+            try:
+                # 已有译文中的导航字段在写出 front matter 时就补回，不必等译文完成后重写
+                nav = nav_metadata(output_path)
+                head = (lambda text: set_front_matter(text, nav)) if nav else None
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(header)
+                    sink = StreamSink(f if self.stream else None, head=head)
+                    translated = self.translate_markdown(content, context, sink)
+                    if nav:
+                        translated = set_front_matter(translated, nav)
+                    sink.flush()
+                    # 非流式模式，或文件中的内容与最终译文不一致（例如块标记不完整时的回退）时整体重写
+                    if not sink.wrote(translated):
+                        sink.reset()
+                        f.write(translated)
+                os.replace(tmp_path, output_path)
+            except Exception as e:
+                partial = tmp_path.read_text(encoding='utf-8') if tmp_path.exists() else ""
+                self._quarantine(file_path, quarantine_path, e, partial)
+                raise
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
             
+            self._translated(file_path, quarantine_path)
+            self._record_file_stats(file_path, sink)
             print(f"✓ 已保存: {output_path}")
             return True
             
         except Exception as e:
+            with self.stats_lock:
+                self.errors.setdefault(str(file_path), str(e))
             print(f"✗ 处理文件失败 {file_path}: {e}")
             return False
+    
+    def translate_files(self, items: List[Tuple[Path, Path, str, Optional[Path]]]) -> List[bool]:
+        """
+        用一次请求翻译多个短文件，批量请求失败或译文不完整时逐个文件翻译
+        
+        Args:
+            items: [(输入文件路径, 输出文件路径, 上下文信息, 隔离路径), ...]
+        
+        Returns:
+            每个文件是否成功
+        """
+        try:
+            documents = []
+            for file_path, _, context, _ in items:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    documents.append((f.read(), context))
+            
+            print(f"正在批量翻译: {', '.join(item[0].name for item in items)}")
+            sink = StreamSink()
+            translations = self.translate_batch(documents, sink)
+        except Exception as e:
+            print(f"批量翻译失败（{e}），改为逐个文件翻译")
+            return [self.translate_file(*item) for item in items]
+        
+        results = []
+        for item, translated in zip(items, translations):
+            file_path, output_path, context, quarantine_path = item
+            if translated is None:
+                results.append(self.translate_file(*item))
+                continue
+            try:
+                header = f"""<!--
+原文: {context}
+翻译时间: {time.strftime('%Y-%m-%d %H:%M:%S')}
+-->
+
+"""
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = output_path.with_name(output_path.name + '.part')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(header + carry_nav_metadata(output_path, translated))
+                os.replace(tmp_path, output_path)
+                with self.stats_lock:
+                    self.file_stats[str(file_path)] = {
+                        "seconds": time.monotonic() - sink.start,
+                        "ttft": sink.ttft,
+                        "tokens_per_sec": sink.tokens_per_sec,
+                    }
+                self._translated(file_path, quarantine_path)
+                print(f"✓ 已保存: {output_path}")
+                results.append(True)
+            except Exception as e:
+                self._quarantine(file_path, None, e)
+                print(f"✗ 处理文件失败 {file_path}: {e}")
+                results.append(False)
+        return results
 
 
-def translate_directory(input_dir: Path, output_dir: Path, translator: AITranslator):
+class ProgressReporter:
+    """并发翻译时的进度和吞吐量输出"""
+    
+    def __init__(self, total: int, translator: AITranslator):
+        self.total = total
+        self.translator = translator
+        self.done = 0
+        self.failed = 0
+        self.start = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def update(self, rel_path: Path, success: bool):
+        with self.lock:
+            self.done += 1
+            if not success:
+                self.failed += 1
+            elapsed = max(time.monotonic() - self.start, 1e-6)
+            files_per_min = self.done / elapsed * 60
+            tokens_per_sec = self.translator.total_tokens / elapsed
+            mark = "✓" if success else "✗"
+            print(f"[{self.done}/{self.total}] {mark} {rel_path}  "
+                  f"{files_per_min:.1f} 文件/分钟, {tokens_per_sec:.0f} tokens/秒, "
+                  f"失败 {self.failed}, 重试 {self.translator.retries}")
+
+
+def plan_batches(md_files: List[Path], batch_tokens: int) -> List[List[Path]]:
+    """
+    把同一目录下的短文件打包为批次，每批原文的估算 token 数不超过 batch_tokens
+    
+    估算 token 数超过预算一半的文件单独成批；batch_tokens 为 0 时每个文件单独成批
+    """
+    batches: List[List[Path]] = []
+    current: List[Path] = []
+    size = 0
+    
+    for file_path in md_files:
+        tokens = estimate_tokens(file_path.read_text(encoding='utf-8')) if batch_tokens else 0
+        if not batch_tokens or tokens > batch_tokens // 2:
+            batches.append([file_path])
+            continue
+        if current and (size + tokens > batch_tokens
+                        or len(current) >= BATCH_MAX_DOCUMENTS
+                        or file_path.parent != current[0].parent):
+            batches.append(current)
+            current = []
+            size = 0
+        current.append(file_path)
+        size += tokens
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_directory(input_dir: Path, output_dir: Path, translator: AITranslator, workers: int = 4,
+                        batch_tokens: int = 0, journal: Optional[TranslationJournal] = None,
+                        resume: bool = False, quarantine_dir: Optional[Path] = None):
     """
     翻译整个目录
     
     Args:
         input_dir: 输入目录（包含原始markdown文件）
         output_dir: 输出目录
-        translator: 翻译器实例
+        translator: 翻译器实例（限流由其令牌桶控制）
+        workers: 并发翻译的线程数
+        batch_tokens: 短文件打包翻译时每批原文的 token 预算，0 表示逐个文件翻译
+        journal: 任务日志，记录每个文件的状态，None 表示不记录
+        resume: 跳过任务日志中已完成且原文未变化的文件，只翻译其余文件
+        quarantine_dir: 翻译失败的文件写到这里（保留相对路径），不覆盖 output_dir 中的译文
     """
-    md_files = list(input_dir.rglob("*.md"))
+    md_files = sorted(input_dir.rglob("*.md"))
+    if journal is not None:
+        sources = {file_path.relative_to(input_dir).as_posix(): source_hash(file_path) for file_path in md_files}
+        todo = set(journal.start(sources, resume))
+        if resume:
+            print(f"\n继续上次的任务: 跳过 {len(md_files) - len(todo)} 个已完成的文件")
+        md_files = [file_path for file_path in md_files if file_path.relative_to(input_dir).as_posix() in todo]
     total = len(md_files)
+    batches = plan_batches(md_files, batch_tokens)
     
-    print(f"\n找到 {total} 个 Markdown 文件")
+    print(f"\n找到 {total} 个 Markdown 文件，并发数 {workers}")
+    if batch_tokens:
+        print(f"打包为 {len(batches)} 个请求（每批最多约 {batch_tokens} tokens）")
     print("=" * 60)
     
-    success_count = 0
+    progress = ProgressReporter(total, translator)
     
-    for i, file_path in enumerate(md_files, 1):
-        # 计算相对路径
-        rel_path = file_path.relative_to(input_dir)
-        output_path = output_dir / rel_path
-        
-        # 生成上下文信息
-        github_path = str(rel_path).replace('\\', '/')
-        context = f"文件路径: gpu-glossary/{github_path}"
-        
-        print(f"\n[{i}/{total}] {rel_path}")
-        
-        # 翻译
-        if translator.translate_file(file_path, output_path, context):
-            success_count += 1
+    def translate_batch(batch: List[Path]) -> int:
+        items = []
+        for file_path in batch:
+            # 计算相对路径
+            rel_path = file_path.relative_to(input_dir)
+            output_path = output_dir / rel_path
+            
+            # 生成上下文信息
+            github_path = str(rel_path).replace('\\', '/')
+            context = f"文件路径: gpu-glossary/{github_path}"
+            quarantine_path = quarantine_dir / rel_path if quarantine_dir is not None else None
+            items.append((file_path, output_path, context, quarantine_path))
+            if journal is not None:
+                journal.mark(rel_path.as_posix(), IN_FLIGHT)
         
-        # 避免API限流
-        if i < total:
-            time.sleep(2)
+        if len(items) == 1:
+            results = [translator.translate_file(*items[0])]
+        else:
+            results = translator.translate_files(items)
+        for file_path, success in zip(batch, results):
+            rel_path = file_path.relative_to(input_dir)
+            if journal is not None:
+                journal.mark(rel_path.as_posix(), DONE if success else FAILED,
+                             translator.errors.get(str(file_path)))
+            progress.update(rel_path, success)
+        return sum(results)
     
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(translate_batch, batch) for batch in batches]
+        success_count = sum(future.result() for future in as_completed(futures))
+    
+    elapsed = time.monotonic() - progress.start
     print("\n" + "=" * 60)
-    print(f"完成! 成功翻译 {success_count}/{total} 个文件")
+    print(f"完成! 成功翻译 {success_count}/{total} 个文件，用时 {elapsed:.1f} 秒，"
+          f"约 {translator.total_tokens} tokens")
+    print(translator.http.summary())
+    if translator.memory is not None:
+        print(f"翻译记忆: 命中 {translator.memory.hits} 块，未命中 {translator.memory.misses} 块")
+    if translator.terminology is not None and translator.term_requests:
+        print(f"术语注入: {translator.term_requests} 次请求，平均每次约 "
+              f"{translator.term_tokens / translator.term_requests:.0f} tokens")
+    if journal is not None:
+        failures = journal.failures()
+        if failures:
+            print(f"失败 {len(failures)} 个文件（使用 --resume 只重试这些文件）:")
+            for rel_path, entry in failures.items():
+                print(f"  {rel_path}: 尝试 {entry['attempts']} 次，{entry['error']}")
+            if quarantine_dir is not None:
+                print(f"部分译文已隔离到: {quarantine_dir}")
+    
+    # 首 token 延迟最高的文件，便于发现上游响应慢的情况
+    slow = sorted(
+        ((path, stats) for path, stats in translator.file_stats.items() if stats["ttft"] is not None),
+        key=lambda item: -item[1]["ttft"],
+    )[:5]
+    if slow:
+        print("首 token 延迟最高的文件:")
+        for path, stats in slow:
+            print(f"  {Path(path).relative_to(input_dir)}: 首 token {stats['ttft']:.2f} 秒，"
+                  f"{stats['tokens_per_sec']:.1f} tokens/秒")
     print("=" * 60)
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="使用 AI 翻译 GPU Glossary")
+    parser.add_argument("-j", "--workers", type=int, default=4, help="并发翻译线程数（默认 4）")
+    parser.add_argument("--rpm", type=float, default=60, help="每分钟请求数上限（默认 60）")
+    parser.add_argument("--tpm", type=float, default=200000, help="每分钟 token 数上限（默认 200000）")
+    parser.add_argument("--memory", type=Path, default=Path(__file__).parent / ".translation-memory.sqlite",
+                        help="翻译记忆数据库路径（默认 .translation-memory.sqlite）")
+    parser.add_argument("--no-memory", action="store_true", help="不使用翻译记忆，整篇翻译")
+    parser.add_argument("--stream", action="store_true",
+                        help="使用流式响应，记录首 token 延迟和生成速度")
+    parser.add_argument("--batch-tokens", type=int, default=0,
+                        help="把同一目录下的短文件打包翻译，每批原文的 token 预算（默认 0，不打包）")
+    parser.add_argument("--resume", action="store_true",
+                        help="从上次中断的地方继续：跳过已完成的文件，只重试失败和未完成的文件")
+    parser.add_argument("--inject-terms", action="store_true",
+                        help="每次请求只附带原文中出现的术语（术语表见 terminology.py），代替提示词中固定的术语列表")
+    parser.add_argument("--journal", type=Path, default=Path(__file__).parent / ".translation-journal.json",
+                        help="任务日志路径（默认 .translation-journal.json）")
+    args = parser.parse_args(argv)
+    
     print("=" * 60)
     print("GPU Glossary AI 翻译工具")
     print("使用 SiliconFlow API (DeepSeek-V3.2-Exp)")
@@ -202,10 +1020,17 @@ def main():
         return
     
     # 创建翻译器
-    translator = AITranslator()
+    memory = None if args.no_memory else TranslationMemory(args.memory)
+    # 文件级并发 × 单个文档内的分段并发，连接池要能容纳所有同时进行的请求
+    http_client = HttpClient(pool_size=args.workers * 4, timeout=(10, 120))
+    translator = AITranslator(requests_per_minute=args.rpm, tokens_per_minute=args.tpm, memory=memory,
+                              chunk_workers=4, stream=args.stream, http_client=http_client,
+                              terminology=Terminology() if args.inject_terms else None)
     
     # 翻译
-    translate_directory(input_dir, output_dir, translator)
+    translate_directory(input_dir, output_dir, translator, workers=args.workers,
+                        batch_tokens=args.batch_tokens, journal=TranslationJournal(args.journal),
+                        resume=args.resume, quarantine_dir=script_dir / "quarantine")
     
     print(f"\n翻译文件保存在: {output_dir}")
 
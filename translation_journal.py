@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+翻译任务日志：记录每个文件的翻译状态（待翻译、翻译中、完成、失败）、尝试次数和错误
+每次状态变化都会原子地写回磁盘，中断后可以用 --resume 从上次停下的地方继续
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+PENDING = "pending"
+IN_FLIGHT = "in-flight"
+DONE = "done"
+FAILED = "failed"
+
+
+def source_hash(path: Path) -> str:
+    """原文内容的哈希，原文变化后即使已完成也要重新翻译"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class TranslationJournal:
+    """线程安全的翻译任务日志"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("files", {})
+            except (OSError, ValueError) as e:
+                print(f"忽略损坏的任务日志 {path}: {e}")
+
+    def start(self, sources: Dict[str, str], resume: bool = False) -> List[str]:
+        """
+        开始一次运行，返回需要翻译的文件
+
+        Args:
+            sources: {相对路径: 原文哈希}
+            resume: 为 True 时跳过已完成且原文未变化的文件，
+                    上次中断时仍在翻译中的文件和失败的文件重新排队；
+                    为 False 时全部重新翻译
+
+        尝试次数和最近一次错误跨运行累计保留
+        """
+        todo = []
+        with self.lock:
+            for rel_path in list(self.entries):
+                if rel_path not in sources:
+                    del self.entries[rel_path]
+            for rel_path, digest in sorted(sources.items()):
+                entry = self.entries.setdefault(rel_path, {"attempts": 0, "error": None})
+                if resume and entry.get("state") == DONE and entry.get("source") == digest:
+                    continue
+                entry["state"] = PENDING
+                entry["source"] = digest
+                todo.append(rel_path)
+            self._save()
+        return todo
+
+    def mark(self, rel_path: str, state: str, error: Optional[str] = None):
+        """更新文件状态；进入翻译中时累计尝试次数"""
+        with self.lock:
+            entry = self.entries.setdefault(rel_path, {"attempts": 0, "error": None})
+            entry["state"] = state
+            entry["updated_at"] = time.strftime('%Y-%m-%d %H:%M:%S')
+            if state == IN_FLIGHT:
+                entry["attempts"] = entry.get("attempts", 0) + 1
+            elif state == DONE:
+                entry["error"] = None
+            elif state == FAILED:
+                entry["error"] = error
+            self._save()
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的文件数"""
+        with self.lock:
+            result = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+            for entry in self.entries.values():
+                result[entry.get("state", PENDING)] += 1
+            return result
+
+    def failures(self) -> Dict[str, dict]:
+        """失败的文件及其记录"""
+        with self.lock:
+            return {rel_path: dict(entry) for rel_path, entry in sorted(self.entries.items())
+                    if entry.get("state") == FAILED}
+
+    def _save(self):
+        # 先写临时文件再替换，进程在写入途中被杀掉也不会损坏日志
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.entries}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
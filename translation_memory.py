@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+翻译记忆：以 SQLite 持久化保存已翻译过的 Markdown 块
+键为 (原文, 模型, 提示词, 术语表版本) 的哈希，原文没有变化的块不再调用 API
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class TranslationMemory:
+    """线程安全的翻译记忆库"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                model TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(source: str, model: str, prompt: str, glossary_version: str) -> str:
+        """计算记忆键；任何一项变化都会使旧译文失效"""
+        digest = hashlib.sha256()
+        for part in (model, prompt, glossary_version, source.strip()):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """查询译文，未命中返回 None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT translation FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, source: str, translation: str, model: str):
+        """保存译文"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO translations (key, source, translation, model, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, source, translation, model, time.time()),
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()